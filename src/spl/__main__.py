@@ -0,0 +1,52 @@
+"""
+Single entry point for the SPL tool chain: python -m spl <command> FILE
+
+Commands:
+    tokens   FILE            dump the token stream
+    parse    FILE            print the AST
+    scopes   FILE            build the symbol table and pretty-print it
+    types    FILE            type check and print a report
+    codegen  FILE [--out F]  generate intermediate code (.int.txt + .html)
+    basic    FILE [--out F]  also emit numbered BASIC (.basic.txt)
+    compile  FILE [options]  full parse_file.py interface (any mix of phases)
+"""
+
+import argparse
+import sys
+
+from . import pipeline
+
+# phase commands → the parse_file.py flag they switch on
+_PHASE_FLAGS = {
+    "parse": "print_ast",
+    "scopes": "dump_scopes",
+    "codegen": "codegen",
+    "basic": "emit_basic",
+}
+
+
+def main(argv=None) -> None:
+    ap = argparse.ArgumentParser(prog="spl", description="SPL compiler")
+    sub = ap.add_subparsers(dest="command", required=True)
+
+    sub.add_parser("tokens", help="Dump the token stream").add_argument("file")
+    sub.add_parser("types", help="Type check and print a report").add_argument("file")
+    pipeline.add_phase_args(sub.add_parser(
+        "compile", help="Run any combination of phases (parse_file.py options)"))
+    for name, flag in _PHASE_FLAGS.items():
+        sp = sub.add_parser(name, help=f"Run the pipeline up to --{flag.replace('_', '-')}")
+        pipeline.add_phase_args(sp)
+        sp.set_defaults(**{flag: True})
+
+    args = ap.parse_args(argv)
+
+    if args.command == "tokens":
+        pipeline.dump_tokens(pipeline.read_source(args.file))
+    elif args.command == "types":
+        sys.exit(pipeline.check_types(args.file))
+    else:
+        pipeline.run(args)
+
+
+if __name__ == "__main__":
+    main()
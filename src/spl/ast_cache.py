@@ -0,0 +1,97 @@
+"""
+Opt-in persistent parse cache for the command-line tools (--cache).
+
+Parsing is the same work on every run, even when the user only asks for a
+later phase. With --cache the parsed (un-numbered) AST is pickled into a
+per-user cache directory, keyed by the source's SHA-1 and CACHE_VERSION, so
+re-running on an unchanged file skips lexing and parsing.
+
+Loading a pickle can run arbitrary code, so the cache never lives next to the
+sources (where a checkout could ship a planted entry): it defaults to
+$XDG_CACHE_HOME/spl (~/.cache/spl), is created private to the user, and is
+ignored when it is owned by someone else or writable by group/others.
+
+Usage:
+    from spl.ast_cache import parse_cached
+    ast = parse_cached(path, text)      # raises ValueError / SyntaxError like Parser
+"""
+
+import hashlib
+import os
+import pickle
+import stat
+from typing import Optional
+
+from .astnodes import Program
+
+# Part of every cache key: bump whenever the AST node classes change shape, so
+# pickles written by an older compiler are never loaded.
+CACHE_VERSION = 2
+
+
+def default_cache_dir() -> str:
+    """Per-user cache directory: $XDG_CACHE_HOME/spl, else ~/.cache/spl."""
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "spl")
+
+
+def cache_path(path: str, text: str, cache_dir: str) -> str:
+    """Cache file for `text` read from `path`: <cache_dir>/<basename>.<sha1>.pkl"""
+    key = hashlib.sha1(f"{CACHE_VERSION}\0{text}".encode()).hexdigest()
+    return os.path.join(cache_dir, f"{os.path.basename(path)}.{key}.pkl")
+
+
+def _private_dir(cache_dir: str) -> bool:
+    """True if cache_dir exists, belongs to this user and only they can write to it."""
+    try:
+        st = os.stat(cache_dir)
+    except OSError:
+        return False
+    if not stat.S_ISDIR(st.st_mode):
+        return False
+    if hasattr(os, "getuid") and (st.st_uid != os.getuid() or st.st_mode & 0o022):
+        return False
+    return True
+
+
+def parse_cached(path: str, text: str, cache_dir: Optional[str] = None) -> Program:
+    """
+    Return the AST for `text`, loading it from the cache when there is an entry
+    for this exact text; otherwise parse and store it.
+    Lexical/syntax errors propagate and are never cached.
+    """
+    cache_dir = cache_dir or default_cache_dir()
+    cache = cache_path(path, text, cache_dir)
+    trusted = _private_dir(cache_dir)
+    if trusted and os.path.exists(cache):
+        try:
+            with open(cache, "rb") as f:
+                (ast,) = pickle.load(f)
+            return ast
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError, ValueError):
+            pass  # unreadable or stale format: fall back to parsing
+
+    from .parser import Parser  # only needed on a cache miss
+    ast = Parser(text).parse()
+    if not trusted:
+        try:
+            os.makedirs(cache_dir, mode=0o700, exist_ok=True)
+        except OSError:
+            return ast  # caching is best-effort (e.g. read-only home)
+        if not _private_dir(cache_dir):
+            return ast  # pre-existing directory someone else can write to: never use it
+    tmp = f"{cache}.{os.getpid()}.tmp"
+    try:
+        # write a temporary file and move it into place, so a failed dump never
+        # leaves a truncated pickle under the real name
+        with open(tmp, "wb") as f:
+            pickle.dump((ast,), f, protocol=5)
+        os.replace(tmp, cache)
+    except Exception:
+        # caching is best-effort: disk full, or an AST pickle cannot store
+        # (RecursionError on very deeply nested terms, PicklingError)
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+    return ast
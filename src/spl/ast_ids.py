@@ -16,143 +16,64 @@ Usage:
     assign_ids(ast)  # All nodes now have unique node_ids
 """
 
-from typing import Any
+import sys
+from typing import Any, Callable
 from .astnodes import *
 
 
+def walk(root: Any, *visitors: Callable[[Any], None]) -> int:
+    """
+    Visit every node under `root` once in pre-order, calling each visitor on
+    the node in the order given. Several per-node passes can share this one
+    walk instead of each re-traversing the tree.
+
+    Returns:
+        Number of nodes visited
+    """
+    children = CHILDREN.get
+    count = 0
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        for visit in visitors:
+            visit(node)
+        count += 1
+        kids = children(type(node))
+        if kids is not None:
+            # push in reverse so the first child is popped (visited) first
+            stack.extend(reversed(kids(node)))
+    return count
+
+
 class ASTIDAssigner:
     """
-    Visitor that traverses the entire AST and assigns unique sequential IDs
-    to every node, starting from 1.
+    Assigns unique sequential IDs to every node of the AST, starting from 1.
+    visit_program numbers nodes in the pre-order of walk(), with visit_node as
+    the first visitor; any extra visitors passed to it run on each node in the
+    same walk, right after the node gets its ID.
     """
     
     def __init__(self):
         self.next_id = 1
     
-    def assign_id(self, node: Any) -> None:
-        """Assign an ID to a node if it doesn't have one yet."""
-        if hasattr(node, 'node_id'):
-            if node.node_id == -1:  # Only assign if not yet assigned
-                node.node_id = self.next_id
-                self.next_id += 1
-    
-    def visit_program(self, node: Program) -> None:
-        """Visit the root Program node and all its children."""
-        self.assign_id(node)
-        
-        # Global variables are just strings (no node objects)
-        # Visit procedure definitions
-        for pdef in node.procs:
-            self.visit_procdef(pdef)
-        
-        # Visit function definitions
-        for fdef in node.funcs:
-            self.visit_funcdef(fdef)
-        
-        # Visit main
-        self.visit_main(node.main)
-    
-    def visit_procdef(self, node: ProcDef) -> None:
-        """Visit a procedure definition."""
-        self.assign_id(node)
-        # params are just strings
-        self.visit_body(node.body)
-    
-    def visit_funcdef(self, node: FuncDef) -> None:
-        """Visit a function definition."""
-        self.assign_id(node)
-        # params are just strings
-        self.visit_body(node.body)
-        self.visit_atom(node.ret)
-    
-    def visit_body(self, node: Body) -> None:
-        """Visit a procedure/function body."""
-        self.assign_id(node)
-        # locals are just strings
-        self.visit_algo(node.algo)
-    
-    def visit_main(self, node: Main) -> None:
-        """Visit the main program block."""
-        self.assign_id(node)
-        # variables are just strings
-        self.visit_algo(node.algo)
-    
-    def visit_algo(self, node: Algo) -> None:
-        """Visit an algorithm (sequence of instructions)."""
-        self.assign_id(node)
-        for instr in node.instrs:
-            self.visit_instruction(instr)
-    
-    def visit_instruction(self, node: Any) -> None:
-        """Visit any instruction node."""
-        self.assign_id(node)
-        
-        if isinstance(node, Halt):
-            pass  # No children
-        
-        elif isinstance(node, Print):
-            self.visit_output(node.output)
-        
-        elif isinstance(node, Call):
-            # name is just a string
-            for arg in node.args:
-                self.visit_atom(arg)
-        
-        elif isinstance(node, Assign):
-            # var is just a string
-            if isinstance(node.rhs, Call):
-                self.visit_instruction(node.rhs)  # Call is also an instruction
-            else:
-                self.visit_term(node.rhs)
-        
-        elif isinstance(node, LoopWhile):
-            self.visit_term(node.cond)
-            self.visit_algo(node.body)
-        
-        elif isinstance(node, LoopDoUntil):
-            self.visit_algo(node.body)
-            self.visit_term(node.cond)
-        
-        elif isinstance(node, BranchIf):
-            self.visit_term(node.cond)
-            self.visit_algo(node.then_)
-            if node.else_:
-                self.visit_algo(node.else_)
-    
-    def visit_output(self, node: Any) -> None:
-        """Visit an output node (for print statements)."""
-        if isinstance(node, (VarRef, NumberLit)):
-            self.visit_atom(node)
-        elif isinstance(node, StringLit):
-            self.assign_id(node)
-    
-    def visit_atom(self, node: Any) -> None:
-        """Visit an atomic value (variable reference or number literal)."""
-        self.assign_id(node)
-    
-    def visit_term(self, node: Any) -> None:
-        """Visit a term (expression) node."""
-        self.assign_id(node)
-        
-        if isinstance(node, TermAtom):
-            self.visit_atom(node.atom)
-        
-        elif isinstance(node, TermUn):
-            # op is just a string
-            self.visit_term(node.term)
-        
-        elif isinstance(node, TermBin):
-            self.visit_term(node.left)
-            # op is just a string
-            self.visit_term(node.right)
+    def visit_node(self, node: Any) -> None:
+        """Give `node` the next ID (every AST node has a node_id slot)."""
+        node.node_id = self.next_id
+        self.next_id += 1
 
+    def visit_program(self, node: Program, *visitors: Callable[[Any], None]) -> None:
+        """Number the root Program node and all its descendants."""
+        walk(node, self.visit_node, *visitors)
 
-def assign_ids(ast: Program) -> Program:
+
+def assign_ids(ast: Program, *visitors: Callable[[Any], None]) -> Program:
     """
     Assign unique IDs to all nodes in the AST tree.
     
     Args:
         ast: The root Program node of the AST
+        visitors: Optional extra per-node callbacks run in the same pre-order
+                  walk, each called right after the node gets its ID
     
     Returns:
         The same ast object (modified in place) for convenience
@@ -164,7 +85,7 @@ def assign_ids(ast: Program) -> Program:
         >>> # Now all nodes have unique node_id values >= 1
     """
     assigner = ASTIDAssigner()
-    assigner.visit_program(ast)
+    assigner.visit_program(ast, *visitors)
     return ast
 
 
@@ -179,59 +100,7 @@ def count_nodes(node: Any) -> int:
     Returns:
         Total number of nodes in the subtree
     """
-    count = 1  # Count this node
-    
-    if isinstance(node, Program):
-        count += sum(count_nodes(p) for p in node.procs)
-        count += sum(count_nodes(f) for f in node.funcs)
-        count += count_nodes(node.main)
-    
-    elif isinstance(node, (ProcDef, FuncDef)):
-        count += count_nodes(node.body)
-        if isinstance(node, FuncDef):
-            count += count_nodes(node.ret)
-    
-    elif isinstance(node, Body):
-        count += count_nodes(node.algo)
-    
-    elif isinstance(node, Main):
-        count += count_nodes(node.algo)
-    
-    elif isinstance(node, Algo):
-        count += sum(count_nodes(i) for i in node.instrs)
-    
-    elif isinstance(node, Print):
-        count += count_nodes(node.output)
-    
-    elif isinstance(node, Call):
-        count += sum(count_nodes(a) for a in node.args)
-    
-    elif isinstance(node, Assign):
-        count += count_nodes(node.rhs)
-    
-    elif isinstance(node, (LoopWhile, LoopDoUntil)):
-        count += count_nodes(node.cond)
-        count += count_nodes(node.body)
-    
-    elif isinstance(node, BranchIf):
-        count += count_nodes(node.cond)
-        count += count_nodes(node.then_)
-        if node.else_:
-            count += count_nodes(node.else_)
-    
-    elif isinstance(node, TermAtom):
-        count += count_nodes(node.atom)
-    
-    elif isinstance(node, TermUn):
-        count += count_nodes(node.term)
-    
-    elif isinstance(node, TermBin):
-        count += count_nodes(node.left)
-        count += count_nodes(node.right)
-    
-    # Leaf nodes (VarRef, NumberLit, StringLit, Halt) have no children
-    
-    return count
+    return len(AstArena.build(node))
 
 
 def get_all_node_ids(node: Any) -> list[int]:
@@ -245,64 +114,55 @@ def get_all_node_ids(node: Any) -> list[int]:
     Returns:
         List of all node_ids in the subtree
     """
-    ids = []
-    
-    def collect(n):
-        if hasattr(n, 'node_id'):
-            ids.append(n.node_id)
-        
-        # Recurse into children
-        if isinstance(n, Program):
-            for p in n.procs:
-                collect(p)
-            for f in n.funcs:
-                collect(f)
-            collect(n.main)
-        
-        elif isinstance(n, (ProcDef, FuncDef)):
-            collect(n.body)
-            if isinstance(n, FuncDef):
-                collect(n.ret)
-        
-        elif isinstance(n, (Body, Main)):
-            collect(n.algo)
-        
-        elif isinstance(n, Algo):
-            for i in n.instrs:
-                collect(i)
-        
-        elif isinstance(n, Print):
-            collect(n.output)
-        
-        elif isinstance(n, Call):
-            for a in n.args:
-                collect(a)
-        
-        elif isinstance(n, Assign):
-            collect(n.rhs)
-        
-        elif isinstance(n, (LoopWhile, LoopDoUntil)):
-            collect(n.cond)
-            collect(n.body)
-        
-        elif isinstance(n, BranchIf):
-            collect(n.cond)
-            collect(n.then_)
-            if n.else_:
-                collect(n.else_)
-        
-        elif isinstance(n, TermAtom):
-            collect(n.atom)
-        
-        elif isinstance(n, TermUn):
-            collect(n.term)
-        
-        elif isinstance(n, TermBin):
-            collect(n.left)
-            collect(n.right)
-    
-    collect(node)
-    return ids
+    return [n.node_id for n in AstArena.build(node).nodes]
+
+
+# Indentation prefixes, precomputed so each printed line costs one lookup
+_PREFIX = ['  ' * i for i in range(256)]
+
+# Per-type printers for print_node_ids. Each returns the items to emit after
+# the node's header line, in order: a str is a finished line, a
+# (node, indent) pair is a subtree to print at that indent.
+_PRINTERS = {
+    Program: lambda n, p, i: [
+        f"{p}  globals: {list(n.globals)}\n",
+        *((c, i + 1) for c in n.procs),
+        *((c, i + 1) for c in n.funcs),
+        (n.main, i + 1),
+    ],
+    ProcDef: lambda n, p, i: [
+        f"{p}  name: {n.name}\n", f"{p}  params: {n.params}\n", (n.body, i + 1),
+    ],
+    FuncDef: lambda n, p, i: [
+        f"{p}  name: {n.name}\n", f"{p}  params: {n.params}\n", (n.body, i + 1),
+        f"{p}  return:\n", (n.ret, i + 2),
+    ],
+    Body: lambda n, p, i: [f"{p}  locals: {n.locals}\n", (n.algo, i + 1)],
+    Main: lambda n, p, i: [f"{p}  variables: {list(n.variables)}\n", (n.algo, i + 1)],
+    Algo: lambda n, p, i: [(c, i + 1) for c in n.instrs],
+    Print: lambda n, p, i: [(n.output, i + 1)],
+    Call: lambda n, p, i: [f"{p}  name: {n.name}\n", *((a, i + 1) for a in n.args)],
+    Assign: lambda n, p, i: [f"{p}  var: {n.var}\n", f"{p}  rhs:\n", (n.rhs, i + 1)],
+    LoopWhile: lambda n, p, i: [
+        f"{p}  cond:\n", (n.cond, i + 1), f"{p}  body:\n", (n.body, i + 1),
+    ],
+    LoopDoUntil: lambda n, p, i: [
+        f"{p}  body:\n", (n.body, i + 1), f"{p}  cond:\n", (n.cond, i + 1),
+    ],
+    BranchIf: lambda n, p, i: [
+        f"{p}  cond:\n", (n.cond, i + 1), f"{p}  then:\n", (n.then_, i + 1),
+        *((f"{p}  else:\n", (n.else_, i + 1)) if n.else_ else ()),
+    ],
+    VarRef: lambda n, p, i: [f"{p}  value: {n.name}\n"],
+    NumberLit: lambda n, p, i: [f"{p}  value: {n.value}\n"],
+    StringLit: lambda n, p, i: [f"{p}  value: {n.value}\n"],
+    TermAtom: lambda n, p, i: [(n.atom, i + 1)],
+    TermUn: lambda n, p, i: [f"{p}  op: {n.op}\n", (n.term, i + 1)],
+    TermBin: lambda n, p, i: [
+        f"{p}  left:\n", (n.left, i + 1), f"{p}  op: {n.op}\n",
+        f"{p}  right:\n", (n.right, i + 1),
+    ],
+}
 
 
 def print_node_ids(node: Any, indent: int = 0) -> None:
@@ -312,95 +172,23 @@ def print_node_ids(node: Any, indent: int = 0) -> None:
     
     Args:
         node: Root node to print
-        indent: Current indentation level (for recursive calls)
+        indent: Indentation level of the root node
     """
-    prefix = "  " * indent
-    node_id = getattr(node, 'node_id', -1)
-    node_type = type(node).__name__
-    print(f"{prefix}{node_type} [id={node_id}]")
-    
-    if isinstance(node, Program):
-        print(f"{prefix}  globals: {node.globals}")
-        for p in node.procs:
-            print_node_ids(p, indent + 1)
-        for f in node.funcs:
-            print_node_ids(f, indent + 1)
-        print_node_ids(node.main, indent + 1)
-    
-    elif isinstance(node, (ProcDef, FuncDef)):
-        print(f"{prefix}  name: {node.name}")
-        print(f"{prefix}  params: {node.params}")
-        print_node_ids(node.body, indent + 1)
-        if isinstance(node, FuncDef):
-            print(f"{prefix}  return:")
-            print_node_ids(node.ret, indent + 2)
-    
-    elif isinstance(node, Body):
-        print(f"{prefix}  locals: {node.locals}")
-        print_node_ids(node.algo, indent + 1)
-    
-    elif isinstance(node, Main):
-        print(f"{prefix}  variables: {node.variables}")
-        print_node_ids(node.algo, indent + 1)
-    
-    elif isinstance(node, Algo):
-        for i in node.instrs:
-            print_node_ids(i, indent + 1)
-    
-    elif isinstance(node, Halt):
-        pass  # No children
-    
-    elif isinstance(node, Print):
-        print_node_ids(node.output, indent + 1)
-    
-    elif isinstance(node, Call):
-        print(f"{prefix}  name: {node.name}")
-        for arg in node.args:
-            print_node_ids(arg, indent + 1)
-    
-    elif isinstance(node, Assign):
-        print(f"{prefix}  var: {node.var}")
-        print(f"{prefix}  rhs:")
-        print_node_ids(node.rhs, indent + 1)
-    
-    elif isinstance(node, LoopWhile):
-        print(f"{prefix}  cond:")
-        print_node_ids(node.cond, indent + 1)
-        print(f"{prefix}  body:")
-        print_node_ids(node.body, indent + 1)
-    
-    elif isinstance(node, LoopDoUntil):
-        print(f"{prefix}  body:")
-        print_node_ids(node.body, indent + 1)
-        print(f"{prefix}  cond:")
-        print_node_ids(node.cond, indent + 1)
-    
-    elif isinstance(node, BranchIf):
-        print(f"{prefix}  cond:")
-        print_node_ids(node.cond, indent + 1)
-        print(f"{prefix}  then:")
-        print_node_ids(node.then_, indent + 1)
-        if node.else_:
-            print(f"{prefix}  else:")
-            print_node_ids(node.else_, indent + 1)
-    
-    elif isinstance(node, (VarRef, NumberLit, StringLit)):
-        val = node.name if isinstance(node, VarRef) else node.value
-        print(f"{prefix}  value: {val}")
-    
-    elif isinstance(node, TermAtom):
-        print_node_ids(node.atom, indent + 1)
-    
-    elif isinstance(node, TermUn):
-        print(f"{prefix}  op: {node.op}")
-        print_node_ids(node.term, indent + 1)
-    
-    elif isinstance(node, TermBin):
-        print(f"{prefix}  left:")
-        print_node_ids(node.left, indent + 1)
-        print(f"{prefix}  op: {node.op}")
-        print(f"{prefix}  right:")
-        print_node_ids(node.right, indent + 1)
+    buf = []
+    stack = [(node, indent)]
+    while stack:
+        item = stack.pop()
+        if type(item) is str:
+            buf.append(item)
+            continue
+        n, ind = item
+        prefix = _PREFIX[ind] if ind < len(_PREFIX) else "  " * ind
+        buf.append(f"{prefix}{type(n).__name__} [id={getattr(n, 'node_id', -1)}]\n")
+        printer = _PRINTERS.get(type(n))
+        if printer:
+            # push in reverse so items come off the stack in print order
+            stack.extend(reversed(printer(n, prefix, ind)))
+    sys.stdout.write(''.join(buf))
 
 
 # ============================================================================
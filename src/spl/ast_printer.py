@@ -2,57 +2,75 @@
 from __future__ import annotations
 from dataclasses import is_dataclass, fields
 from typing import Any
-from io import StringIO
 
 _IND = "  "  # two spaces
+_INDENTS = tuple(_IND * i for i in range(128))  # indent strings by depth, built once
+
+# node class -> tuple of its dataclass field names, filled on first sight of each class
+_FIELD_CACHE: dict[type, tuple[str, ...]] = {}
 
 def ast_to_str(node: Any) -> str:
     """Return a human-readable tree for any AST node/list/primitive."""
-    buf = StringIO()
-    _pp(node, buf, 0)
-    return buf.getvalue()
+    buf: list[str] = []  # many tiny fragments: append + one join beats StringIO.write
+    # Explicit work stack instead of recursion: entries are either a ready-made
+    # line (str) or a (node, indent) pair still to be printed. Children are
+    # pushed in reverse so they pop in the original pre-order.
+    stack: list[Any] = [(node, 0)]
+    pop, push, emit = stack.pop, stack.append, buf.append
+    while stack:
+        item = pop()
+        if item.__class__ is str:
+            emit(item)
+            continue
+        node, indent = item
+        ind = _INDENTS[indent] if indent < 128 else _IND * indent
+        handler = _DISPATCH.get(type(node))
+        if handler is None:
+            # Dataclasses (all AST nodes): remember the class so the next one is a single dict hit
+            handler = _DISPATCH[type(node)] = _pp_dataclass if is_dataclass(node) else _pp_leaf
+        handler(node, emit, push, ind, indent)
+    return "".join(buf)
 
 def print_ast(node: Any) -> None:
     """Print the AST to stdout (convenience wrapper)."""
     print(ast_to_str(node))
 
-def _pp(node: Any, buf: StringIO, indent: int) -> None:
-    ind = _IND * indent
+def _pp_none(node: None, emit, push, ind: str, indent: int) -> None:
+    emit(f"{ind}None\n")
 
-    # None
-    if node is None:
-        buf.write(f"{ind}None\n")
-        return
+def _pp_leaf(node: Any, emit, push, ind: str, indent: int) -> None:
+    # Primitive leaves (and the fallback, which shouldn't really happen with your AST types)
+    emit(f"{ind}{repr(node)}\n")
 
-    # Primitive leaves
-    if isinstance(node, (str, int, float, bool)):
-        buf.write(f"{ind}{repr(node)}\n")
-        return
+def _pp_list(node: list | tuple, emit, push, ind: str, indent: int) -> None:
+    # Sequences (e.g., Algo.instrs, Program.globals, args, params, etc.)
+    emit(f"{ind}List[{len(node)}]\n")
+    ind_plus = ind + _IND
+    for i in range(len(node) - 1, -1, -1):
+        push((node[i], indent + 2))
+        push(f"{ind_plus}[{i}]\n")
 
-    # Lists (e.g., Algo.instrs, Program.globals, args, params, etc.)
-    if isinstance(node, list):
-        buf.write(f"{ind}List[{len(node)}]\n")
-        for i, item in enumerate(node):
-            buf.write(f"{ind}{_IND}[{i}]\n")
-            _pp(item, buf, indent + 2)
+def _pp_dataclass(node: Any, emit, push, ind: str, indent: int) -> None:
+    cls = node.__class__.__name__
+    names = _FIELD_CACHE.get(node.__class__)
+    if names is None:
+        names = _FIELD_CACHE[node.__class__] = tuple(f.name for f in fields(node))
+    values = [getattr(node, name) for name in names]  # nodes use __slots__, so no __dict__ shortcut
+    # If all fields are primitive (nice inline single-line like VarRef/NumberLit)
+    if all(v is None or isinstance(v, (str, int, float, bool)) for v in values):
+        inner = ", ".join([name + "=" + repr(v) for name, v in zip(names, values)])
+        emit(f"{ind}{cls}({inner})\n")
         return
 
-    # Dataclasses (all AST nodes)
-    if is_dataclass(node):
-        cls = node.__class__.__name__
-        # If all fields are primitive (nice inline single-line like VarRef/NumberLit)
-        flds = fields(node)
-        values = [getattr(node, f.name) for f in flds]
-        if all(isinstance(v, (str, int, float, bool)) or v is None for v in values):
-            inner = ", ".join(f"{f.name}={repr(getattr(node, f.name))}" for f in flds)
-            buf.write(f"{ind}{cls}({inner})\n")
-            return
-
-        buf.write(f"{ind}{cls}\n")
-        for f in flds:
-            buf.write(f"{ind}{_IND}{f.name}:\n")
-            _pp(getattr(node, f.name), buf, indent + 2)
-        return
+    emit(f"{ind}{cls}\n")
+    ind_plus = ind + _IND
+    for k in range(len(names) - 1, -1, -1):
+        push((values[k], indent + 2))
+        push(f"{ind_plus}{names[k]}:\n")
 
-    # Fallback (shouldn't really happen with your AST types)
-    buf.write(f"{ind}{repr(node)}\n")
+# type(node) -> printer; dataclass types are added on first sight
+_DISPATCH = {
+    type(None): _pp_none,
+    str: _pp_leaf, int: _pp_leaf, float: _pp_leaf, bool: _pp_leaf,
+    list: _pp_list, tuple: _pp_list,
+}
@@ -3,11 +3,13 @@ AST Node Definitions for SPL Compiler (Phase 2 Updated)
 
 Each node now includes:
 - node_id: int (default -1, assigned by ast_ids.assign_ids())
+- __slots__ (via dataclass(slots=True)): no per-node __dict__, so every
+  declared field, node_id included, is always present
 - resolved: Optional[SymbolTableEntry] for VarRef (filled by scope checker)
 """
 
 from dataclasses import dataclass
-from typing import List, Optional, Union, TYPE_CHECKING
+from typing import Any, List, Optional, Tuple, Union, TYPE_CHECKING
 
 if TYPE_CHECKING:
     from .symbol_table import SymbolTableEntry
@@ -17,17 +19,17 @@ if TYPE_CHECKING:
 # Top-level program structure
 # ============================================================================
 
-@dataclass
+@dataclass(slots=True)
 class Program:
     """Root: glob { VARIABLES } proc { PROCDEFS } func { FUNCDEFS } main { MAINPROG }"""
-    globals: List[str]
-    procs: List['ProcDef']
-    funcs: List['FuncDef']
+    globals: Tuple[str, ...]
+    procs: Tuple['ProcDef', ...]
+    funcs: Tuple['FuncDef', ...]
     main: 'Main'
     node_id: int = -1
 
 
-@dataclass
+@dataclass(slots=True)
 class ProcDef:
     """Procedure: NAME ( PARAM ) { BODY }"""
     name: str
@@ -36,7 +38,7 @@ class ProcDef:
     node_id: int = -1
 
 
-@dataclass
+@dataclass(slots=True)
 class FuncDef:
     """Function: NAME ( PARAM ) { BODY ; return ATOM }"""
     name: str
@@ -46,7 +48,7 @@ class FuncDef:
     node_id: int = -1
 
 
-@dataclass
+@dataclass(slots=True)
 class Body:
     """Body: local { MAXTHREE } ALGO"""
     locals: List[str]
@@ -54,10 +56,10 @@ class Body:
     node_id: int = -1
 
 
-@dataclass
+@dataclass(slots=True)
 class Main:
     """Main: var { VARIABLES } ALGO"""
-    variables: List[str]
+    variables: Tuple[str, ...]
     algo: 'Algo'
     node_id: int = -1
 
@@ -66,10 +68,10 @@ class Main:
 # Algorithms (instruction sequences)
 # ============================================================================
 
-@dataclass
+@dataclass(slots=True)
 class Algo:
-    """Sequence of instructions: INSTR ( ; INSTR )*"""
-    instrs: List['Instr']
+    """Sequence of instructions: INSTR ( ; INSTR )* (a tuple: fixed once parsed)"""
+    instrs: Tuple['Instr', ...]
     node_id: int = -1
 
 
@@ -77,20 +79,20 @@ class Algo:
 # Instructions
 # ============================================================================
 
-@dataclass
+@dataclass(slots=True)
 class Halt:
     """halt instruction"""
     node_id: int = -1
 
 
-@dataclass
+@dataclass(slots=True)
 class Print:
     """print OUTPUT"""
     output: 'Output'
     node_id: int = -1
 
 
-@dataclass
+@dataclass(slots=True)
 class Call:
     """Procedure/function call: NAME ( INPUT )"""
     name: str
@@ -98,7 +100,7 @@ class Call:
     node_id: int = -1
 
 
-@dataclass
+@dataclass(slots=True)
 class Assign:
     """Assignment: VAR = TERM or VAR = NAME ( INPUT )"""
     var: str
@@ -106,7 +108,7 @@ class Assign:
     node_id: int = -1
 
 
-@dataclass
+@dataclass(slots=True)
 class LoopWhile:
     """while TERM { ALGO }"""
     cond: 'Term'
@@ -114,7 +116,7 @@ class LoopWhile:
     node_id: int = -1
 
 
-@dataclass
+@dataclass(slots=True)
 class LoopDoUntil:
     """do { ALGO } until TERM"""
     body: 'Algo'
@@ -122,7 +124,7 @@ class LoopDoUntil:
     node_id: int = -1
 
 
-@dataclass
+@dataclass(slots=True)
 class BranchIf:
     """if TERM { ALGO } [else { ALGO }]"""
     cond: 'Term'
@@ -135,7 +137,7 @@ class BranchIf:
 # Atoms and Literals
 # ============================================================================
 
-@dataclass
+@dataclass(slots=True)
 class VarRef:
     """Variable reference - Phase 2: includes resolved field for name resolution"""
     name: str
@@ -143,14 +145,14 @@ class VarRef:
     resolved: Optional['SymbolTableEntry'] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class NumberLit:
     """Numeric literal"""
     value: int
     node_id: int = -1
 
 
-@dataclass
+@dataclass(slots=True)
 class StringLit:
     """String literal"""
     value: str
@@ -161,14 +163,14 @@ class StringLit:
 # Terms (Expressions)
 # ============================================================================
 
-@dataclass
+@dataclass(slots=True)
 class TermAtom:
     """Term: ATOM"""
     atom: 'Atom'
     node_id: int = -1
 
 
-@dataclass
+@dataclass(slots=True)
 class TermUn:
     """Term: ( UNOP TERM )"""
     op: str  # 'neg' or 'not'
@@ -176,7 +178,7 @@ class TermUn:
     node_id: int = -1
 
 
-@dataclass
+@dataclass(slots=True)
 class TermBin:
     """Term: ( TERM BINOP TERM )"""
     left: 'Term'
@@ -192,4 +194,69 @@ class TermBin:
 Atom = Union[VarRef, NumberLit]
 Output = Union[VarRef, NumberLit, StringLit]
 Term = Union[TermAtom, TermUn, TermBin]
-Instr = Union[Halt, Print, Call, Assign, LoopWhile, LoopDoUntil, BranchIf]
\ No newline at end of file
+Instr = Union[Halt, Print, Call, Assign, LoopWhile, LoopDoUntil, BranchIf]
+
+# ============================================================================
+# Flat storage (structure-of-arrays view of a tree)
+# ============================================================================
+
+# Children of each node type, in visit order (types not listed are leaves)
+CHILDREN = {
+    Program: lambda n: (*n.procs, *n.funcs, n.main),
+    ProcDef: lambda n: (n.body,),
+    FuncDef: lambda n: (n.body, n.ret),
+    Body: lambda n: (n.algo,),
+    Main: lambda n: (n.algo,),
+    Algo: lambda n: n.instrs,
+    Print: lambda n: (n.output,),
+    Call: lambda n: n.args,
+    Assign: lambda n: (n.rhs,),
+    LoopWhile: lambda n: (n.cond, n.body),
+    LoopDoUntil: lambda n: (n.body, n.cond),
+    BranchIf: lambda n: (n.cond, n.then_, n.else_) if n.else_ else (n.cond, n.then_),
+    TermAtom: lambda n: (n.atom,),
+    TermUn: lambda n: (n.term,),
+    TermBin: lambda n: (n.left, n.right),
+}
+
+
+def _no_children(node: Any) -> tuple:
+    return ()
+
+
+class AstArena:
+    """
+    Pre-order flat storage of an AST subtree, as parallel lists indexed by
+    visit position. On a freshly numbered tree, nodes[k].node_id == k + 1.
+
+    Fields:
+      - nodes: the node objects
+      - kinds: type(node) of each node
+      - parents: index of each node's parent (-1 for the root)
+    """
+
+    def __init__(self):
+        self.nodes: List[Any] = []
+        self.kinds: List[type] = []
+        self.parents: List[int] = []
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    @classmethod
+    def build(cls, root: Any) -> 'AstArena':
+        """Flatten the subtree under `root` (any AST node) without recursion."""
+        arena = cls()
+        nodes, kinds, parents = arena.nodes, arena.kinds, arena.parents
+        children = CHILDREN.get
+        stack = [(root, -1)]
+        while stack:
+            node, parent = stack.pop()
+            idx = len(nodes)
+            kind = type(node)
+            nodes.append(node)
+            kinds.append(kind)
+            parents.append(parent)
+            # push in reverse so the first child is popped (visited) first
+            stack.extend((c, idx) for c in reversed(children(kind, _no_children)(node)))
+        return arena
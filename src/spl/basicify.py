@@ -1,35 +1,39 @@
 import re
+from functools import partial
 
 LABEL_DEF_RE = re.compile(r'^\s*REM\s+([A-Za-z]+\d+)\s*$')
 JUMP_RE = re.compile(r'\b(GOTO|THEN)\s+([A-Za-z]+\d+)\b')
 
+
+def _jump_target(label_line: dict, m) -> str:
+    """JUMP_RE replacement: the jump with its label swapped for the label's line number."""
+    cmd, lab = m.group(1), m.group(2)
+    target = label_line.get(lab)
+    # If label not found, keep as-is
+    return f"{cmd} {target if target is not None else lab}"
+
+
 def intermediate_to_basic(lines: list[str], start: int = 10, step: int = 10) -> list[str]:
     """Turn unnumbered intermediate code into numbered BASIC with label resolution."""
-    # 1) Number the lines (skip blanks)
+    # 1) Number the lines (skip blanks) and build label → lineNumber map
+    #    (strict label-only REM lines) in the same pass
     numbered = []
+    label_line = {}
     lnum = start
     for raw in lines:
-        if raw.strip() == "":
+        if not raw or raw.isspace():
             continue
         numbered.append((lnum, raw))
+        if "REM" in raw:  # only REM lines can define a label
+            m = LABEL_DEF_RE.match(raw)
+            if m:
+                label_line[m.group(1)] = lnum  # e.g., "DO1" -> 70
         lnum += step
 
-    # 2) Build label → lineNumber map (strict label-only REM lines)
-    label_line = {}
-    for ln, text in numbered:
-        m = LABEL_DEF_RE.match(text)
-        if m:
-            label_line[m.group(1)] = ln  # e.g., "DO1" -> 70
-
-    # 3) Rewrite GOTO/THEN label usages
-    out = []
-    for ln, text in numbered:
-        def repl(m):
-            cmd, lab = m.group(1), m.group(2)
-            target = label_line.get(lab)
-            # If label not found, keep as-is
-            return f"{cmd} {target if target is not None else lab}"
+    # 2) Rewrite GOTO/THEN label usages; one dict probe per jump
+    repl = partial(_jump_target, label_line)
 
-        new_text = JUMP_RE.sub(repl, text)
-        out.append(f"{ln} {new_text}")
-    return out
+    # most lines have no jump at all: a substring test skips the regex for them
+    sub = JUMP_RE.sub
+    return [f"{ln} {sub(repl, text) if 'GOTO' in text or 'THEN' in text else text}"
+            for ln, text in numbered]
@@ -1,8 +1,8 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Optional
 
 
-@dataclass
+@dataclass(slots=True)
 class Diagnostic:
     """
     Structured diagnostic produced by the checker.
@@ -17,8 +17,15 @@ class Diagnostic:
     message: str
     node_id: int = -1
     scope_path: Optional[str] = None
+    _suffix: Optional[str] = field(default=None, init=False, repr=False, compare=False)
 
     def __str__(self) -> str:
-        node = f" (node #{self.node_id})" if self.node_id is not None and self.node_id != -1 else ""
-        scope = f" [{self.scope_path}]" if self.scope_path else ""
-        return f"{self.kind}: {self.message}{node}{scope}"
+        # node/scope suffix, formatted on first render only (most diagnostics are
+        # counted or compared, never printed) and kept since diagnostics are
+        # immutable in practice
+        suffix = self._suffix
+        if suffix is None:
+            node = f" (node #{self.node_id})" if self.node_id is not None and self.node_id != -1 else ""
+            scope = f" [{self.scope_path}]" if self.scope_path else ""
+            suffix = self._suffix = node + scope
+        return f"{self.kind}: {self.message}{suffix}"
@@ -1,58 +1,58 @@
 # src/spl/ic_html.py
 import html, re
 
-LABEL_RE = re.compile(r'^\s*REM\s+([A-Za-z]+\d+)\s*$')
-GOTO_RE  = re.compile(r'\bGOTO\s+([A-Za-z]+\d+)\b')
-THEN_RE  = re.compile(r'\bTHEN\s+([A-Za-z]+\d+)\b')
+# all three rules in one scan: a jump becomes a link, a label-only REM line gets an anchor
+LINK_RE = re.compile(
+    r'\b(?P<kind>GOTO|THEN)\s+(?P<lbl>[A-Za-z]+\d+)\b'
+    r'|^\s*REM\s+(?P<anchor>[A-Za-z]+\d+)\s*$'
+)
 
-def _link_labels(line: str) -> str:
-    # THEN Lx / GOTO Lx → THEN <a href="#Lx">Lx</a>
-    def repl_goto(m): return f'GOTO <a href="#{m.group(1)}">{m.group(1)}</a>'
-    def repl_then(m): return f'THEN <a href="#{m.group(1)}">{m.group(1)}</a>'
-    line = GOTO_RE.sub(repl_goto, line)
-    line = THEN_RE.sub(repl_then, line)
-    return line
+def _link_repl(m: re.Match) -> str:
+    anchor = m.group('anchor')
+    if anchor is not None:
+        return f'<a id="{anchor}"></a>{m.group(0)}'
+    lbl = m.group('lbl')
+    return f'{m.group("kind")} <a href="#{lbl}">{lbl}</a>'
 
-def write_intermediate_html(lines: list[str], out_path: str) -> None:
-    """
-    Render the un-numbered intermediate code as a linked HTML page:
-    - REM Lx lines become anchors (#Lx)
-    - GOTO Lx / THEN Lx become links to those anchors
-    """
-    items = []
-    for raw in lines:
-        text = html.escape(raw)
-        # make links for THEN/GOTO labels
-        linked = _link_labels(text)
-
-        # make REM Lx an anchor target
-        m = LABEL_RE.match(raw)
-        if m:
-            label = m.group(1)
-            linked = f'<a id="{label}"></a>{linked}'
-
-        items.append(f'<li><code>{linked}</code></li>')
-
-    html_doc = f"""<!doctype html>
+_HTML_HEAD = """<!doctype html>
 <html lang="en">
 <head>
 <meta charset="utf-8" />
 <title>Intermediate Code</title>
 <style>
-  body {{ font: 14px/1.4 system-ui, sans-serif; margin: 24px; }}
-  ol {{ padding-left: 2em; }}
-  code {{ white-space: pre; }}
-  .hint {{ color:#666; margin-bottom:8px; }}
+  body { font: 14px/1.4 system-ui, sans-serif; margin: 24px; }
+  ol { padding-left: 2em; }
+  code { white-space: pre; }
+  .hint { color:#666; margin-bottom:8px; }
 </style>
 </head>
 <body>
   <h1>Intermediate Code</h1>
   <p class="hint">Labels appear as <code>REM Lx</code>; jumps link to those labels.</p>
   <ol>
-    {''.join(items)}
+    """
+
+_HTML_TAIL = """
   </ol>
 </body>
 </html>
 """
+
+def write_intermediate_html(lines: list[str], out_path: str) -> None:
+    """
+    Render the un-numbered intermediate code as a linked HTML page:
+    - REM Lx lines become anchors (#Lx)
+    - GOTO Lx / THEN Lx become links to those anchors
+    """
     with open(out_path, "w", encoding="utf-8") as f:
-        f.write(html_doc)
+        # stream each transformed line straight into the file buffer; nothing
+        # proportional to the program size is held in memory
+        write = f.write
+        write(_HTML_HEAD)
+        sub, escape = LINK_RE.sub, html.escape
+        for raw in lines:
+            # escaping never touches labels or keywords, so one pass on the escaped text
+            write('<li><code>')
+            write(sub(_link_repl, escape(raw)))
+            write('</code></li>')
+        write(_HTML_TAIL)
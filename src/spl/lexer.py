@@ -1,12 +1,23 @@
 # lexer.py
+# SPL source is ASCII-only: the CLI reads files as latin-1, so any non-ASCII
+# byte arrives here as a single character and fails as an unknown character.
 import re
+import sys
 from .tokens import T, Token, KEYWORDS
 
-IDENT_RE  = re.compile(r'[a-z][a-z0-9]*') # match user defined name - lower-case only
-NUM_RE    = re.compile(r'(0|[1-9][0-9]*)') #match number - either a 0 or number not starting with zero 
-STR_RE    = re.compile(r'"([A-Za-z0-9]{0,15})"')  # match string literal of max 15 alphanumerical chars  
+IDENT_RE  = re.compile(r'[a-z][a-z0-9]*', re.ASCII) # match user defined name - lower-case only
+NUM_RE    = re.compile(r'(0|[1-9][0-9]*)', re.ASCII) #match number - either a 0 or number not starting with zero 
+STR_RE    = re.compile(r'"([A-Za-z0-9]{0,15})"', re.ASCII)  # match string literal of max 15 alphanumerical chars  
 
 PUNCT = {'{':T.LBRACE,'}':T.RBRACE,'(':T.LPAREN,')':T.RPAREN,';':T.SEMI,'=':T.ASSIGN,'>':T.GT} #map punctuation
+PUNCT_TAB = [None]*128 # same map indexed by ord(ch): one list index instead of a hash probe
+for _c, _t in PUNCT.items(): PUNCT_TAB[ord(_c)] = _t
+
+# one master regex (like lex/flex building a single DFA): m.lastgroup tells which rule matched
+TOKEN_RE = re.compile(
+    rf'(?P<WS>\s+)|(?P<STR>{STR_RE.pattern})|(?P<NUM>{NUM_RE.pattern})|(?P<IDENT>{IDENT_RE.pattern})|(?P<PUNCT>[{{}}();=>])',
+    re.ASCII # SPL is ASCII-only: skip the Unicode tables (\s is then [ \t\n\r\f\v])
+)
 
 class Lexer:
     def __init__(self, text:str):
@@ -15,62 +26,97 @@ class Lexer:
         self.line=1; # to track position for error message
         self.col=1; # to track position for error message
         self.n=len(text) #total length
+        self._match=TOKEN_RE.match # bound once: next_token skips the global + attribute lookup per token
+        self.error=None # lexical error that stopped tokenize_all (None if the input was fully lexed)
 
     def _peek(self): 
         return self.s[self.i] if self.i<self.n else '\0' #return current character without consuming it. Return \0 if past end. 
     
-    def _adv(self, k=1): #advance by k characters 
-        for _ in range(k):
-            if self.i<self.n:
-                ch=self.s[self.i]; self.i+=1
-                if ch=='\n': self.line+=1; self.col=1 # move to next line and reset column 
-                else: self.col+=1 # move to next column 
-
-    # skip white space (spaces, tabs, newlines)
-    def _skip_ws(self):
-        while self.i<self.n and self._peek().isspace():
-            self._adv()
+    def _adv(self, k:int): #advance by k characters in one step (no per-char loop)
+        i=self.i; j=min(i+k,self.n) # clamp at end of input, so never overshoot
+        nl=self.s.count('\n',i,j) # count newlines in C on the bounds, no slice copy
+        if nl: self.line+=nl; self.col=j-self.s.rfind('\n',i,j) # column restarts after the last newline
+        else: self.col+=j-i # same line: just move the column
+        self.i=j
 
     # go to next token 
     def next_token(self)->Token:
-        self._skip_ws() #skip white space 
-        if self.i>=self.n: return Token(T.EOF,'',self.line,self.col) # if at end of input, return EOF token
-
-        ch=self._peek() #look at next character to decide what token type it starts 
+        while True:
+            if self.i>=self.n: return Token(T.EOF,'',self.line,self.col) # if at end of input, return EOF token
 
-        # punctuators ({ } ( ) ; = >)
-        if ch in PUNCT:
-            t=PUNCT[ch]; 
-            tok=Token(t,ch,self.line,self.col); self._adv(); 
-            return tok
+            m=self._match(self.s, self.i, self.n) # one regex scan decides the token type
+            if not m: #if no rule matches
+                ch=self._peek()
+                if ch=='"': # string that is unterminated, too long or has invalid chars
+                    raise ValueError(f'Invalid string at {self.line}:{self.col} (only alnum, ≤15, closed with ")')
+                raise ValueError(f'Unknown character "{ch}" at {self.line}:{self.col}')
 
-        # string
-        if ch=='"':
-            m=STR_RE.match(self.s, self.i) # try match full string literal 
-            if not m: #if no match (unterminated, too long, invalid chars)
-                raise ValueError(f'Invalid string at {self.line}:{self.col} (only alnum, ≤15, closed with ")')
-            lex=m.group(0)
-            val=m.group(1) #remove quotes
-            tok=Token(T.STRING,val,self.line,self.col); self._adv(len(lex)) # emit string token with no quotes and advance by length of string
-            return tok
+            kind=m.lastgroup
+            lex=m.group()
 
-        # number
-        m=NUM_RE.match(self.s, self.i) #try match a number
-        if m: # if match 
-            lex=m.group(0)
-            tok=Token(T.NUMBER,lex,self.line,self.col); self._adv(len(lex)) #emit number token and advance by length
-            return tok
+            # skip white space (spaces, tabs, newlines) and try again
+            if kind=='WS':
+                self._adv(len(lex))
+                continue
 
-        # identifier / keyword
-        m=IDENT_RE.match(self.s, self.i) #try to match a user defined name 
-        if m: #if match 
-            lex=m.group(0)
-            if lex in KEYWORDS: # if its a keyword 
-                tok=Token(KEYWORDS[lex],lex,self.line,self.col) # emit that keyword token
-            else: 
-                tok=Token(T.IDENT,lex,self.line,self.col) # otherwise emit as a user defined name / identifier
-            self._adv(len(lex)) #advance by length of of match
+            if kind=='PUNCT': # punctuators ({ } ( ) ; = >)
+                tok=Token(PUNCT_TAB[ord(lex)],lex,self.line,self.col)
+            elif kind=='STR': # emit string token with no quotes
+                val=lex[1:-1]
+                tok=Token(T.STRING,sys.intern(val),self.line,self.col)
+            else:
+                lex=sys.intern(lex) # equal names/numbers share one str object, across files and with identifier literals (identity fast path in dicts)
+                if kind=='NUM':
+                    tok=Token(T.NUMBER,lex,self.line,self.col,int(lex))
+                else: # keyword token if it is one, otherwise a user defined name / identifier (one dict probe)
+                    tok=Token(KEYWORDS.get(lex,T.IDENT),lex,self.line,self.col)
+            self._adv(len(lex)) #advance by length of match
             return tok
 
-        #if no rule matches
-        raise ValueError(f'Unknown character "{ch}" at {self.line}:{self.col}')
+    # scan the rest of the input in one call (same tokens as repeated next_token)
+    def tokenize_all(self)->list[Token]:
+        """
+        Return every remaining token, ending with EOF. On a lexical error the list
+        stops before the bad token and the ValueError is kept in self.error instead
+        of being raised, so callers can report it where next_token would have.
+        """
+        s=self.s; i=self.i; n=self.n; line=self.line; col=self.col # all hot-loop state in locals
+        match=TOKEN_RE.match; intern=sys.intern; kw=KEYWORDS.get; punct=PUNCT_TAB
+        out=[]; emit=out.append
+        nums={} # lexeme -> int: a literal repeated in the source is converted once and shares one int
+        while i<n:
+            m=match(s,i,n)
+            if not m: #if no rule matches
+                if s[i]=='"':
+                    self.error=ValueError(f'Invalid string at {line}:{col} (only alnum, ≤15, closed with ")')
+                else:
+                    self.error=ValueError(f'Unknown character "{s[i]}" at {line}:{col}')
+                break
+            kind=m.lastgroup
+            j=m.end()
+            if kind=='WS': # only white space can contain newlines
+                nl=s.count('\n',i,j)
+                if nl: line+=nl; col=j-s.rfind('\n',i,j)
+                else: col+=j-i
+                i=j
+                continue
+            lex=s[i:j]
+            if kind=='PUNCT':
+                emit(Token(punct[ord(lex)],lex,line,col))
+            elif kind=='STR': # emit string token with no quotes
+                val=lex[1:-1]
+                emit(Token(T.STRING,intern(val),line,col))
+            else:
+                lex=intern(lex)
+                if kind=='NUM':
+                    v=nums.get(lex)
+                    if v is None: v=nums[lex]=int(lex)
+                    emit(Token(T.NUMBER,lex,line,col,v))
+                else:
+                    emit(Token(kw(lex,T.IDENT),lex,line,col))
+            col+=j-i # tokens never span lines
+            i=j
+        else:
+            emit(Token(T.EOF,'',line,col))
+        self.i=i; self.line=line; self.col=col
+        return out
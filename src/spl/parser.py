@@ -1,36 +1,77 @@
 # parser.py
+from array import array
 from .tokens import T, Token
 from .astnodes import *
 from .lexer import Lexer
 
 # Tokens that can begin an instruction
-INSTR_START = {T.HALT, T.PRINT, T.IDENT, T.WHILE, T.DO, T.IF}
+INSTR_START = frozenset({T.HALT, T.PRINT, T.IDENT, T.WHILE, T.DO, T.IF})
+# same, as a bitmask over the int tags: bit t is set when tag t starts an instruction
+_INSTR_START_MASK = sum(1 << t for t in INSTR_START)
+# Tokens that can sit between the two operands of a binary TERM
+_BINOPS = frozenset({T.EQ, T.GT, T.OR, T.AND, T.PLUS, T.MINUS, T.MULT, T.DIV})
+# Plain module names for the tags tested in loops (no attribute lookup on T)
+_IDENT = T.IDENT
+_NUMBER = T.NUMBER
+_SEMI = T.SEMI
+_UNOPS = (T.NEG, T.NOT)
+_ATOM_STARTS = (T.IDENT, T.NUMBER)
 
 
 class Parser:
+    # fixed field set: attribute reads are slot descriptors, not __dict__ probes
+    __slots__ = ("lexer", "toks", "types", "k", "cur")
+
     def __init__(self, text: str):
         self.lexer = Lexer(text)
-        # prime 2-token lookahead
-        self.cur = self.lexer.next_token()
-        self.nxt = self.lexer.next_token()
+        # lex everything up front; advancing is then just an index into the list
+        toks = self.lexer.tokenize_all()
+        if self.lexer.error is None:
+            # two spare EOFs: eating the final EOF and peeking past it stay in
+            # bounds, so on well-formed input the index never runs off the end
+            toks += (toks[-1], toks[-1])
+        self.toks = toks
+        # token tags as a parallel int array: lookahead only ever needs the tag.
+        # A lexical error gets a 0 tag (no T member) after the last good token,
+        # which matches nothing, so the error is raised once the parser reaches it.
+        self.types = array('i', [t.typ for t in toks])
+        if self.lexer.error is not None:
+            self.types.append(0)
+        self.k = -1  # index of self.cur in toks
+        self._advance()  # load the first token
 
     # --- low-level token helpers -------------------------------------------------
 
     def _advance(self):
-        self.cur = self.nxt
-        self.nxt = self.lexer.next_token()
+        k = self.k + 1
+        try:
+            self.cur = self.toks[k]
+        except IndexError:
+            # only a lexical error leaves the list without its EOF padding
+            raise self.lexer.error from None
+        self.k = k
+
+    def _err(self, msg: str, tok: Token | None = None) -> SyntaxError:
+        """SyntaxError for `msg` at `tok` (default: the current token); built only on failure."""
+        if tok is None:
+            tok = self.cur
+        return SyntaxError(f'{msg} at {tok.line}:{tok.col}')
 
     def _eat(self, typ: T) -> Token:
-        if self.cur.typ != typ:
-            raise SyntaxError(
-                f'expected {typ.name}, found {self.cur.typ.name} at {self.cur.line}:{self.cur.col}'
-            )
         tok = self.cur
-        self._advance()
+        if tok.typ is not typ:
+            raise self._err(f'expected {typ.name}, found {tok.typ.name}', tok)
+        # _advance inlined: _eat runs once per token
+        k = self.k + 1
+        try:
+            self.cur = self.toks[k]
+        except IndexError:
+            raise self.lexer.error from None
+        self.k = k
         return tok
 
     def _match(self, typ: T) -> bool:
-        if self.cur.typ == typ:
+        if self.cur.typ is typ:
             self._advance()
             return True
         return False
@@ -65,18 +106,21 @@ class Parser:
     # --- small list helpers ------------------------------------------------------
 
     # VARIABLES -> (VAR)*
-    def _variables(self) -> list[str]:
+    def _variables(self) -> tuple[str, ...]:
         names = []
-        while self.cur.typ == T.IDENT:  # VAR ::= user-defined-name (lexer ensures not keyword)
-            names.append(self._eat(T.IDENT).lexeme)
-        return names
+        cur = self.cur
+        while cur.typ is _IDENT:  # VAR ::= user-defined-name (lexer ensures not keyword)
+            names.append(cur.lexeme)
+            self._advance()
+            cur = self.cur
+        return tuple(names)
 
     # PROCDEFS -> (PDEF)*
-    def _procdefs(self) -> list[ProcDef]:
+    def _procdefs(self) -> tuple[ProcDef, ...]:
         acc = []
-        while self.cur.typ == T.IDENT:
+        while self.cur.typ is _IDENT:
             acc.append(self._pdef())
-        return acc
+        return tuple(acc)
 
     def _pdef(self) -> ProcDef:
         name = self._eat(T.IDENT).lexeme
@@ -89,11 +133,11 @@ class Parser:
         return ProcDef(name, params, body)
 
     # FUNCDEFS -> (FDEF)*
-    def _funcdefs(self) -> list[FuncDef]:
+    def _funcdefs(self) -> tuple[FuncDef, ...]:
         acc = []
-        while self.cur.typ == T.IDENT:
+        while self.cur.typ is _IDENT:
             acc.append(self._fdef())
-        return acc
+        return tuple(acc)
 
     def _fdef(self) -> FuncDef:
         name = self._eat(T.IDENT).lexeme
@@ -120,13 +164,22 @@ class Parser:
         return self._maxthree_vars()
 
     # MAXTHREE -> (VAR (VAR (VAR)?)?)?
+    # Unrolled to match the grammar: no loop or range() iterator per header.
     def _maxthree_vars(self) -> list[str]:
         names = []
-        for _ in range(3):
-            if self.cur.typ == T.IDENT:
-                names.append(self._eat(T.IDENT).lexeme)
-            else:
-                break
+        advance = self._advance
+        if self.cur.typ is not _IDENT:
+            return names
+        names.append(self.cur.lexeme)
+        advance()
+        if self.cur.typ is not _IDENT:
+            return names
+        names.append(self.cur.lexeme)
+        advance()
+        if self.cur.typ is not _IDENT:
+            return names
+        names.append(self.cur.lexeme)
+        advance()
         return names
 
     def _mainprog(self) -> Main:
@@ -142,106 +195,106 @@ class Parser:
     # ALGO -> INSTR (';' INSTR)*
     # Guard the repetition so we don't steal the ';' that belongs to ' ; return ' in FDEF.
     def _algo(self) -> Algo:
-        instrs = [self._instr()]
-        while self.cur.typ == T.SEMI and self.nxt.typ in INSTR_START:
-            self._eat(T.SEMI)
-            instrs.append(self._instr())
-        return Algo(instrs)
+        instr = self._instr
+        instrs = [instr()]
+        types = self.types
+        semi, start_mask = _SEMI, _INSTR_START_MASK  # locals: read once per statement
+        while self.cur.typ is semi and (start_mask >> types[self.k + 1]) & 1:
+            self._advance()  # the ';' just checked
+            instrs.append(instr())
+        return Algo(tuple(instrs))  # frozen: later passes only iterate/index
 
     def _instr(self):
-        t = self.cur.typ
-
-        if t == T.HALT:
-            self._eat(T.HALT)
-            return Halt()
+        handler = _INSTR_HANDLERS.get(self.cur.typ)
+        if handler is None:
+            raise self._err(f'unexpected token {self.cur.typ.name}')
+        return handler(self)
+
+    def _instr_halt(self) -> Halt:
+        self._eat(T.HALT)
+        return Halt()
+
+    def _instr_print(self) -> Print:
+        self._eat(T.PRINT)
+        out = self._output()
+        return Print(out)
+
+    def _instr_ident(self):
+        # Could be:
+        #   NAME '(' INPUT ')'                 (proc call)
+        #   VAR '=' NAME '(' INPUT ')'         (assign func call)
+        #   VAR '=' TERM                       (assign general term)
+        name = self._eat(T.IDENT).lexeme
 
-        if t == T.PRINT:
-            self._eat(T.PRINT)
-            out = self._output()
-            return Print(out)
+        if self.cur.typ == T.LPAREN:
+            # proc call: NAME '(' INPUT ')'
+            self._eat(T.LPAREN)
+            args = self._input_atoms()
+            self._eat(T.RPAREN)
+            return Call(name, args)
 
-        if t == T.IDENT:
-            # Could be:
-            #   NAME '(' INPUT ')'                 (proc call)
-            #   VAR '=' NAME '(' INPUT ')'         (assign func call)
-            #   VAR '=' TERM                       (assign general term)
-            name = self._eat(T.IDENT).lexeme
+        if self.cur.typ == T.ASSIGN:
+            # assignment: VAR '=' ...
+            self._eat(T.ASSIGN)
 
+            # After '=', three shapes are possible:
+            # 1) '(' ... ')'         -> TERM (parenthesized unary/binary/term)
+            # 2) IDENT '(' ... ')'   -> function call on RHS
+            # 3) IDENT or NUMBER     -> ATOM (plain term)
             if self.cur.typ == T.LPAREN:
-                # proc call: NAME '(' INPUT ')'
-                self._eat(T.LPAREN)
-                args = self._input_atoms()
-                self._eat(T.RPAREN)
-                return Call(name, args)
-
-            if self.cur.typ == T.ASSIGN:
-                # assignment: VAR '=' ...
-                self._eat(T.ASSIGN)
-
-                # After '=', three shapes are possible:
-                # 1) '(' ... ')'         -> TERM (parenthesized unary/binary/term)
-                # 2) IDENT '(' ... ')'   -> function call on RHS
-                # 3) IDENT or NUMBER     -> ATOM (plain term)
-                if self.cur.typ == T.LPAREN:
-                    rhs = self._term()
-                    return Assign(var=name, rhs=rhs)
-
-                if self.cur.typ == T.IDENT:
-                    fname = self._eat(T.IDENT).lexeme
-                    if self.cur.typ == T.LPAREN:
-                        self._eat(T.LPAREN)
-                        args = self._input_atoms()
-                        self._eat(T.RPAREN)
-                        return Assign(var=name, rhs=Call(fname, args))
-                    else:
-                        return Assign(var=name, rhs=TermAtom(VarRef(fname)))
-
-                if self.cur.typ == T.NUMBER:
-                    num = int(self._eat(T.NUMBER).lexeme)
-                    return Assign(var=name, rhs=TermAtom(NumberLit(num)))
-
-                # Anything else after '=': delegate to term parser (will raise if invalid)
                 rhs = self._term()
                 return Assign(var=name, rhs=rhs)
 
-            # IDENT not followed by '(' or '=' is invalid as a statement
-            raise SyntaxError(
-                f'unexpected IDENT in statement at {self.cur.line}:{self.cur.col}'
-            )
-
-        if t == T.WHILE:
-            self._eat(T.WHILE)
-            cond = self._term()
-            self._eat(T.LBRACE)
-            body = self._algo()
-            self._eat(T.RBRACE)
-            return LoopWhile(cond, body)
+            if self.cur.typ == T.IDENT:
+                fname = self._eat(T.IDENT).lexeme
+                if self.cur.typ == T.LPAREN:
+                    self._eat(T.LPAREN)
+                    args = self._input_atoms()
+                    self._eat(T.RPAREN)
+                    return Assign(var=name, rhs=Call(fname, args))
+                else:
+                    return Assign(var=name, rhs=TermAtom(VarRef(fname)))
+
+            if self.cur.typ == T.NUMBER:
+                num = self._eat(T.NUMBER).value  # converted by the lexer
+                return Assign(var=name, rhs=TermAtom(NumberLit(num)))
+
+            # Anything else after '=': delegate to term parser (will raise if invalid)
+            rhs = self._term()
+            return Assign(var=name, rhs=rhs)
+
+        # IDENT not followed by '(' or '=' is invalid as a statement
+        raise self._err('unexpected IDENT in statement')
+
+    def _instr_while(self) -> LoopWhile:
+        self._eat(T.WHILE)
+        cond = self._term()
+        self._eat(T.LBRACE)
+        body = self._algo()
+        self._eat(T.RBRACE)
+        return LoopWhile(cond, body)
 
-        if t == T.DO:
-            self._eat(T.DO)
-            self._eat(T.LBRACE)
-            body = self._algo()
-            self._eat(T.RBRACE)
-            self._eat(T.UNTIL)
-            cond = self._term()
-            return LoopDoUntil(body, cond)
+    def _instr_do(self) -> LoopDoUntil:
+        self._eat(T.DO)
+        self._eat(T.LBRACE)
+        body = self._algo()
+        self._eat(T.RBRACE)
+        self._eat(T.UNTIL)
+        cond = self._term()
+        return LoopDoUntil(body, cond)
 
-        if t == T.IF:
-            self._eat(T.IF)
-            cond = self._term()
+    def _instr_if(self) -> BranchIf:
+        self._eat(T.IF)
+        cond = self._term()
+        self._eat(T.LBRACE)
+        then = self._algo()
+        self._eat(T.RBRACE)
+        if self._match(T.ELSE):
             self._eat(T.LBRACE)
-            then = self._algo()
+            els = self._algo()
             self._eat(T.RBRACE)
-            if self._match(T.ELSE):
-                self._eat(T.LBRACE)
-                els = self._algo()
-                self._eat(T.RBRACE)
-                return BranchIf(cond, then, els)
-            return BranchIf(cond, then, None)
-
-        raise SyntaxError(
-            f'unexpected token {t.name} at {self.cur.line}:{self.cur.col}'
-        )
+            return BranchIf(cond, then, els)
+        return BranchIf(cond, then, None)
 
     # --- small nonterminals ------------------------------------------------------
 
@@ -253,44 +306,88 @@ class Parser:
             return StringLit(s)
         return self._atom()
 
-    # INPUT -> 0..3 ATOM (bounded list)
+    # INPUT -> 0..3 ATOM (bounded list), unrolled like _maxthree_vars
     def _input_atoms(self) -> list[Atom]:
         args = []
-        for _ in range(3):
-            if self.cur.typ in (T.IDENT, T.NUMBER):
-                args.append(self._atom())
-            else:
-                break
+        atom = self._atom
+        typ = self.cur.typ
+        if typ is not _IDENT and typ is not _NUMBER:
+            return args
+        args.append(atom())
+        typ = self.cur.typ
+        if typ is not _IDENT and typ is not _NUMBER:
+            return args
+        args.append(atom())
+        typ = self.cur.typ
+        if typ is not _IDENT and typ is not _NUMBER:
+            return args
+        args.append(atom())
         return args
 
     # TERM -> ATOM | '(' UNOP TERM ')' | '(' TERM BINOP TERM ')'
+    # Iterative: every compound term is parenthesized, so a stack of open
+    # parentheses replaces recursion. Each entry is one of
+    #   None         '(' TERM ...       still waiting for the left operand
+    #   (None, op)   '(' UNOP TERM ')'  waiting for the operand
+    #   (left, op)   '(' TERM BINOP ... waiting for the right operand
     def _term(self):
-        if self.cur.typ in (T.IDENT, T.NUMBER):
-            return TermAtom(self._atom())
-
-        self._eat(T.LPAREN)
-
-        if self.cur.typ in (T.NEG, T.NOT):
-            op = self.cur.lexeme
-            self._eat(self.cur.typ)
-            t = self._term()
-            self._eat(T.RPAREN)
-            return TermUn(op, t)
-
-        # ( TERM BINOP TERM )
-        left = self._term()
-        op_tok = self.cur  # eq, >, or, and, plus, minus, mult, div
-        if op_tok.typ not in (T.EQ, T.GT, T.OR, T.AND, T.PLUS, T.MINUS, T.MULT, T.DIV):
-            raise SyntaxError(f'expected binary op at {op_tok.line}:{op_tok.col}')
-        op = op_tok.lexeme
-        self._eat(op_tok.typ)
-        right = self._term()
-        self._eat(T.RPAREN)
-        return TermBin(left, op, right)
+        pending = []
+        while True:
+            # shift: open parentheses until an atom completes a term
+            if self.cur.typ in _ATOM_STARTS:
+                result = TermAtom(self._atom())
+            else:
+                self._eat(T.LPAREN)
+                tok = self.cur
+                if tok.typ in _UNOPS:
+                    self._advance()  # type already checked
+                    pending.append((None, tok.lexeme))
+                else:
+                    pending.append(None)
+                continue
+
+            # reduce: close every term that `result` completes
+            while pending:
+                frame = pending.pop()
+                if frame is None:
+                    op_tok = self.cur  # eq, >, or, and, plus, minus, mult, div
+                    if op_tok.typ not in _BINOPS:
+                        raise self._err('expected binary op', op_tok)
+                    self._advance()  # type already checked
+                    pending.append((result, op_tok.lexeme))
+                    break  # go parse the right operand
+                left, op = frame
+                self._eat(T.RPAREN)
+                result = TermUn(op, result) if left is None else TermBin(left, op, result)
+            else:
+                return result
 
     def _atom(self):
-        if self.cur.typ == T.IDENT:
-            return VarRef(self._eat(T.IDENT).lexeme)
-        if self.cur.typ == T.NUMBER:
-            return NumberLit(int(self._eat(T.NUMBER).lexeme))
-        raise SyntaxError(f'expected ATOM at {self.cur.line}:{self.cur.col}')
+        tok = self.cur
+        typ = tok.typ
+        if typ is _IDENT:
+            atom = VarRef(tok.lexeme)
+        elif typ is _NUMBER:
+            atom = NumberLit(tok.value)
+        else:
+            raise self._err('expected ATOM', tok)
+        # _advance inlined: every operand and argument passes through here
+        k = self.k + 1
+        try:
+            self.cur = self.toks[k]
+        except IndexError:
+            raise self.lexer.error from None
+        self.k = k
+        return atom
+
+
+# statement parsers keyed by the token that starts them (see INSTR_START); built
+# once for the class as plain functions, so a Parser needs no bound-method table
+_INSTR_HANDLERS = {
+    T.HALT: Parser._instr_halt,
+    T.PRINT: Parser._instr_print,
+    T.IDENT: Parser._instr_ident,
+    T.WHILE: Parser._instr_while,
+    T.DO: Parser._instr_do,
+    T.IF: Parser._instr_if,
+}
@@ -0,0 +1,195 @@
+"""
+SPL compiler pipeline shared by the command-line front ends.
+
+All phases run inside one interpreter: `python -m spl <command>` (see
+spl/__main__.py) and the top-level scripts parse_file.py, check_types.py and
+dump_tokens.py are thin shims over the functions here.
+"""
+
+import argparse
+import os
+import sys
+
+# Phase modules are imported inside the branch that needs them, so a run
+# only pays for the phases it actually executes.
+
+
+def add_phase_args(ap: argparse.ArgumentParser) -> None:
+    """Options of the full compile pipeline (the parse_file.py interface)."""
+    ap.add_argument("file", help="SPL source file (e.g., examples/hello.txt or .spl)")
+    ap.add_argument("--print-ast", action="store_true",
+                    help="Print the AST (Phase 1 output)")
+    ap.add_argument("--check-scopes", action="store_true",
+                    help="Build symbol table (Phase 2). Prints OK or diagnostics.")
+    ap.add_argument("--dump-scopes", action="store_true",
+                    help="Pretty-print the symbol table tree (Phase 2).")
+    ap.add_argument("--type-check", action="store_true",
+                    help="Run SPL type checker (Phase 2.5)")
+    ap.add_argument("--codegen", action="store_true",
+                    help="Generate unnumbered intermediate code (Phase 3) → <input>.int.txt (also .html & .basic.txt for Type A/B)")
+    ap.add_argument("--emit-basic", action="store_true",
+                    help="Emit numbered BASIC with label resolution (FINAL Type A) → <input>.basic.txt")
+    ap.add_argument("--out", help="Override Phase 3 intermediate output file (defaults to <input>.int.txt)")
+    ap.add_argument("--cache", action="store_true",
+                    help="Reuse/store the parsed AST in the per-user cache (~/.cache/spl)")
+
+
+def read_source(path: str) -> str:
+    """
+    Read an SPL source file. Valid SPL is pure ASCII, so latin-1 (a 1:1
+    byte → code point map) is enough and skips UTF-8 validation; any
+    non-ASCII byte still reaches the lexer and is rejected there.
+    """
+    with open(path, "r", encoding="latin-1", buffering=1 << 20) as f:
+        return f.read()
+
+
+def run(args: argparse.Namespace) -> None:
+    """Run the requested phases on args.file; exits with status 1 on the first failing phase."""
+    try:
+        text = read_source(args.file)
+    except FileNotFoundError:
+        print(f"Syntax error: file '{args.file}' not found")
+        sys.exit(1)
+
+    # ---------- Phase 1: parse (also confirms lexing) ----------
+    try:
+        if args.cache:
+            from .ast_cache import parse_cached
+            ast = parse_cached(args.file, text)
+        else:
+            from .parser import Parser
+            ast = Parser(text).parse()
+        print("Tokens accepted")
+        print("Syntax accepted")
+    except ValueError as e:
+        print(f"Lexical error: {e}")
+        sys.exit(1)
+    except SyntaxError as e:
+        print(f"Syntax error: {e}")
+        sys.exit(1)
+
+    if not (args.check_scopes or args.dump_scopes or args.print_ast or args.type_check or args.codegen or args.emit_basic):
+        args.print_ast = True
+    if args.print_ast:
+        from .ast_printer import print_ast
+        print_ast(ast)
+
+    # ---------- Phase 2: Scopes ----------
+    st = None
+    if args.check_scopes or args.dump_scopes or args.type_check or args.codegen or args.emit_basic:
+        from .ast_ids import assign_ids
+        from .scope_checker import ScopeChecker
+        assign_ids(ast)
+        checker = ScopeChecker(ast)
+        st = checker.check()
+
+        if args.dump_scopes:
+            sys.stdout.write(st.pretty_print())
+            sys.stdout.write("\n")
+
+        if checker.diagnostics:
+            print("Naming error:")
+            for d in checker.diagnostics:
+                print(f"  - {d}")
+            sys.exit(1)
+        else:
+            print("Variable Naming and Function Naming accepted")
+
+    # ---------- Phase 3: Types ----------
+    if args.type_check or args.codegen or args.emit_basic:
+        from .type_checker import TypeChecker
+        tc = TypeChecker()
+        try:
+            tc.visit(ast)
+            print("Types accepted")
+        except Exception as e:
+            print(f"Type error: {e}")
+            sys.exit(1)
+
+    # ---------- Phase 4: Intermediate code ----------
+    generated_lines = None
+    if args.codegen or args.emit_basic:
+        base, _ = os.path.splitext(args.file)
+        int_file = args.out or f"{base}.int.txt"
+        html_file = f"{base}.html"
+
+        from .codegen import CodeGenerator
+        from .ic_html import write_intermediate_html
+        print(f"Generating target code → {int_file}")
+        cg = CodeGenerator(ast)
+        if st is not None:
+            cg.symbol_table = st
+        cg.generate(int_file)  
+        print("Intermediate code (TXT) generated.")
+        generated_lines = cg.output  # reuse the in-memory lines; the .txt is only a user artifact
+
+        try:
+            write_intermediate_html(generated_lines, html_file)
+            print(f"Intermediate code (HTML) generated → {html_file}")
+        except Exception as e:
+            print(f"Warning: failed to write HTML ({e})")
+
+    # ---------- Phase 5: Executable BASIC .txt ----------
+    if args.emit_basic:
+        base, _ = os.path.splitext(args.file)
+        basic_file = f"{base}.basic.txt"
+
+        basic_lines = cg.to_basic(start=10, step=10)
+        with open(basic_file, "w", encoding="ascii") as f:
+            # stream the lines through the file buffer; no joined copy of the whole program
+            write = f.write
+            for line in basic_lines:
+                write(line)
+                write("\n")
+        print(f"Executable BASIC emitted → {basic_file}")
+
+
+def dump_tokens(text: str) -> None:
+    """Print one line per token: line:col, token type, lexeme."""
+    from .lexer import Lexer
+    lx = Lexer(text)
+    for tok in lx.tokenize_all():
+        print(f"{tok.line}:{tok.col}\t{tok.typ.name}\t{tok.lexeme!r}")
+    if lx.error is not None:
+        raise lx.error
+
+
+def check_types(filepath: str) -> int:
+    """Parse and type check a file, printing a report. Returns the exit status."""
+    if not os.path.exists(filepath):
+        print(f"Error: File '{filepath}' not found")
+        return 1
+
+    # Read source file
+    source = read_source(filepath)
+
+    print(f"Type checking: {filepath}")
+    print("=" * 60)
+
+    from .parser import Parser
+    from .type_checker import TypeChecker
+
+    try:
+        # Parse the program
+        parser = Parser(source)
+        ast = parser.parse()
+        print("✓ Parsing successful\n")
+
+        # Type check the program
+        checker = TypeChecker()
+        is_correct = checker.check_program(ast)
+
+        print()
+        checker.print_errors()
+
+        return 0 if is_correct else 1
+
+    except SyntaxError as e:
+        print(f"✗ Syntax Error: {e}")
+        return 1
+    except Exception as e:
+        print(f"✗ Error: {e}")
+        import traceback
+        traceback.print_exc()
+        return 1
@@ -6,12 +6,14 @@ name resolution and scoping rules.
 
 The checker operates in multiple passes:
 1. Build the base scope hierarchy (Everywhere → Global/Procedure/Function/Main) [M1 - DONE]
-2. Collect top-level declarations (globals, proc names, func names) [M2 - TODO]
-3. For each proc/func, create Local scopes and collect params/locals [M2 - TODO]
-4. Resolve all variable uses in ALGO blocks [M3 - TODO]
+2. Collect all declarations in one walk: proc/func names with their Local
+   scopes (params/locals), then globals and main variables [M2]
+3. Resolve all variable uses in ALGO blocks [M3]
 """
 
-from typing import Dict, List, Optional, Any
+import hashlib
+from collections import OrderedDict
+from typing import Dict, List, Optional, Any, Tuple
 from .symbol_table import SymbolTable, SymbolTableEntry, create_base_scopes
 from .astnodes import *
 from .errors import Diagnostic
@@ -47,6 +49,15 @@ class ScopeChecker:
         # Optional map from VarRef node_id to decl_node_id (debugging)
         self.uses_to_decls: Dict[int, int] = {}
 
+        # Base scope IDs (Global/Procedure/Function/Main), cached by check()
+        self._global_id: Optional[int] = None
+        self._proc_id: Optional[int] = None
+        self._func_id: Optional[int] = None
+        self._main_id: Optional[int] = None
+
+        # Last proxy decl_node_id handed out (see _proxy_id); real node_ids stay far below
+        self._proxy_counter = 10_000_000
+
     def check(self) -> SymbolTable:
         """
         Main entry point: run all checking passes.
@@ -59,21 +70,18 @@ class ScopeChecker:
         """
         # Step 1: Build base scope hierarchy (M1 - DONE)
         self._build_base_scopes()
+        base = self.symbol_table.base_scopes
+        self._global_id, self._proc_id, self._func_id, self._main_id = (
+            base[k] for k in ('global', 'procedure', 'function', 'main')
+        )
 
-        # Step 2: Collect declarations (M2)
-        self._collect_global_declarations()
-        self._collect_proc_declarations()
-        self._collect_func_declarations()
-        self._collect_main_variables()
-        self._check_cross_category_clashes()
-
-        # Step 3: Build local scopes for each proc/func (M2)
-        self._build_local_scopes()
+        # Step 2: Collect declarations and build local scopes, in one pass (M2)
+        self._collect_declarations()
 
-        # Step 4: Resolve variable uses (M3 - TODO)
+        # Step 3: Resolve variable uses (M3)
         self._resolve_uses()
 
-        # Step 5: Return the symbol table (M4: diagnostics are collected, not raised)
+        # Step 4: Return the symbol table (M4: diagnostics are collected, not raised)
         return self.symbol_table
 
     # ========================================================================
@@ -99,378 +107,139 @@ class ScopeChecker:
         create_base_scopes(self.symbol_table)
 
     # ========================================================================
-    # M2: DECLARATION PASSES (TODO)
+    # M2: DECLARATIONS (one pass over the program's declarations)
     # ========================================================================
 
-    def _collect_global_declarations(self) -> None:
+    def _collect_declarations(self) -> None:
         """
-        Insert global variables into the Global scope.
-
-        M2:
-        1. Iterate over self.ast.globals (list of variable names)
-        2. For each name, create a SymbolTableEntry with:
-           - kind='var'
-           - scope_id=self.symbol_table.base_scopes['global']
-           - decl_node_id=??? (globals are just strings, no node!)
-             Option A: Use Program node_id as proxy
-             Option B: Extend AST to have VarDecl nodes
-             For now, can use Program.node_id + index
-        3. Call self.symbol_table.declare(global_scope_id, entry)
-        4. Catch ValueError for duplicates and add to self.diagnostics
-
-        Example:
-            global_id = self.symbol_table.base_scopes['global']
-            for idx, name in enumerate(self.ast.globals):
-                entry = SymbolTableEntry(
-                    name=name,
-                    kind='var',
-                    scope_id=global_id,
-                    decl_node_id=self.ast.node_id + idx + 1  # proxy ID
-                )
-                try:
-                    self.symbol_table.declare(global_id, entry)
-                except ValueError as e:
-                    self.diagnostics.append(str(e))
+        Declare every name in one pass over the AST and report clashes as they occur.
+
+        1. Globals: declared in one declare_many call on the Global scope.
+        2. Each ProcDef, then each FuncDef: declare its name in the Procedure /
+           Function scope (a function may not reuse a procedure name), then build
+           its Local scope right away (see _build_local_scope).
+        3. Main variables: declared like the globals, on the Main scope.
+        4. Each distinct global, then main variable name is checked against the
+           proc and func names collected in step 2 (the "Everywhere" rule), so no
+           separate clash pass re-reads the scopes.
+
+        Diagnostics keep the order of the original pass-per-category checker:
+        duplicate globals, proc/func names, duplicate main variables, clashes,
+        then the Local scopes' diagnostics, which step 2 holds back until last.
+
+        Duplicates are found by lookup before declaring, never by catching the
+        ValueError SymbolTable.declare would raise.
         """
-        global_id = self.symbol_table.base_scopes['global']
-        for idx, name in enumerate(self.ast.globals):
-            entry = SymbolTableEntry(
-                name=name,
-                kind='var',
-                scope_id=global_id,
-                decl_node_id=self._proxy_id(self.ast.node_id, "globals", idx),
-            )
-            try:
-                self.symbol_table.declare(global_id, entry)
-            except ValueError as e:
-                self.diagnostics.append(Diagnostic(kind='DuplicateName', message=str(e), node_id=entry.decl_node_id, scope_path=self.symbol_table.get_scope_path(global_id)))
+        st = self.symbol_table
+        declare = st.declare
+        global_id, proc_id, func_id, main_id = self._global_id, self._proc_id, self._func_id, self._main_id
+        diagnostics = self.diagnostics
+        local_diagnostics: List[Diagnostic] = []
+        proc_scope, func_scope = st.get_scope(proc_id), st.get_scope(func_id)
 
-    def _collect_proc_declarations(self) -> None:
-        """
-        Insert procedure names into the Procedure scope.
-
-        M2:
-        1. Iterate over self.ast.procs
-        2. For each ProcDef, create entry with:
-           - kind='proc'
-           - scope_id=self.symbol_table.base_scopes['procedure']
-           - decl_node_id=pdef.node_id
-        3. Check for duplicates within Procedure scope
-        4. IMPORTANT: Check for clash with function names
-           (both procs and funcs are under Everywhere, so names must be unique)
-
-        Example:
-            proc_id = self.symbol_table.base_scopes['procedure']
-            func_id = self.symbol_table.base_scopes['function']
-
-            for pdef in self.ast.procs:
-                # Check if name already used as function
-                if self.symbol_table.lookup_local(func_id, pdef.name):
-                    self.diagnostics.append(
-                        f"Procedure '{pdef.name}' conflicts with function name"
-                    )
-
-                entry = SymbolTableEntry(
-                    name=pdef.name,
-                    kind='proc',
-                    scope_id=proc_id,
-                    decl_node_id=pdef.node_id
-                )
-                try:
-                    self.symbol_table.declare(proc_id, entry)
-                except ValueError as e:
-                    self.diagnostics.append(str(e))
-        """
-        proc_id = self.symbol_table.base_scopes['procedure']
-        func_id = self.symbol_table.base_scopes['function']
-        for pdef in self.ast.procs:
-            # clash with functions?
-            if self.symbol_table.lookup_local(func_id, pdef.name):
-                self.diagnostics.append(Diagnostic(
-                    kind='CrossCategoryClash',
-                    message=f"Procedure '{pdef.name}' conflicts with function name",
-                    node_id=pdef.node_id,
-                    scope_path=self.symbol_table.get_scope_path(proc_id)
-                ))
-            entry = SymbolTableEntry(
-                name=pdef.name, kind='proc', scope_id=proc_id, decl_node_id=pdef.node_id
-            )
-            try:
-                self.symbol_table.declare(proc_id, entry)
-            except ValueError as e:
-                self.diagnostics.append(Diagnostic(kind='DuplicateName', message=str(e), node_id=pdef.node_id, scope_path=self.symbol_table.get_scope_path(proc_id)))
+        self._declare_variables(global_id, self.ast.globals)
 
-    def _collect_func_declarations(self) -> None:
-        """
-        Insert function names into the Function scope.
+        proc_names = set()  # names declared in proc_scope so far (likewise func_names)
+        for pdef in self.ast.procs:
+            name = pdef.name
+            entry = SymbolTableEntry(name, 'proc', proc_id, pdef.node_id)
+            if name in proc_names:  # already declared: report instead of letting declare raise
+                diagnostics.append(Diagnostic(kind='DuplicateName', message=proc_scope.duplicate_message(entry), node_id=entry.decl_node_id, scope_path=st.get_scope_path(proc_id)))
+            else:
+                declare(proc_id, entry)
+                proc_names.add(name)
+            self._build_local_scope(pdef, 'proc', local_diagnostics)
 
-        M2:
-        Similar to _collect_proc_declarations but for functions.
-        Also check for clash with procedure names.
-        """
-        proc_id = self.symbol_table.base_scopes['procedure']
-        func_id = self.symbol_table.base_scopes['function']
+        func_names = set()
         for fdef in self.ast.funcs:
+            name = fdef.name
+            entry = SymbolTableEntry(name, 'func', func_id, fdef.node_id)
             # clash with procedures?
-            if self.symbol_table.lookup_local(proc_id, fdef.name):
-                self.diagnostics.append(Diagnostic(
+            if name in proc_names:
+                diagnostics.append(Diagnostic(
                     kind='CrossCategoryClash',
-                    message=f"Function '{fdef.name}' conflicts with procedure name",
-                    node_id=fdef.node_id,
-                    scope_path=self.symbol_table.get_scope_path(func_id)
+                    message=f"Function '{name}' conflicts with procedure name",
+                    node_id=entry.decl_node_id,
+                    scope_path=st.get_scope_path(func_id)
                 ))
-            entry = SymbolTableEntry(
-                name=fdef.name, kind='func', scope_id=func_id, decl_node_id=fdef.node_id
-            )
-            try:
-                self.symbol_table.declare(func_id, entry)
-            except ValueError as e:
-                self.diagnostics.append(Diagnostic(kind='DuplicateName', message=str(e), node_id=fdef.node_id, scope_path=self.symbol_table.get_scope_path(func_id)))
-
-
-    def _collect_main_variables(self) -> None:
-        """
-        Insert main block variables into the Main scope.
-
-        M2 DONE:
-        1. Iterate over self.ast.main.variables
-        2. Create entries with kind='var', scope_id=main_scope_id
-        3. Similar proxy node_id issue as globals
-        """
-        main_id = self.symbol_table.base_scopes['main']
-        for idx, name in enumerate(self.ast.main.variables):
-            entry = SymbolTableEntry(
-                name=name,
-                kind='var',
-                scope_id=main_id,
-                decl_node_id=self._proxy_id(self.ast.main.node_id, "main", idx),
+            if name in func_names:
+                diagnostics.append(Diagnostic(kind='DuplicateName', message=func_scope.duplicate_message(entry), node_id=entry.decl_node_id, scope_path=st.get_scope_path(func_id)))
+            else:
+                declare(func_id, entry)
+                func_names.add(name)
+            self._build_local_scope(fdef, 'func', local_diagnostics)
+
+        self._declare_variables(main_id, self.ast.main.variables)
+
+        if proc_names or func_names:
+            for scope_id, names, label in (
+                (global_id, self.ast.globals, "Variable"),
+                (main_id, self.ast.main.variables, "Main variable"),
+            ):
+                path = None  # scope path, built on the first clash only
+                # each distinct name once, in declaration order
+                for name in dict.fromkeys(names):
+                    for clashes, category in ((proc_names, "procedure"), (func_names, "function")):
+                        if name in clashes:
+                            path = path or st.get_scope_path(scope_id)
+                            diagnostics.append(Diagnostic(
+                                kind='CrossCategoryClash',
+                                message=f"{label} '{name}' conflicts with {category} name",
+                                node_id=-1,
+                                scope_path=path
+                            ))
+
+        diagnostics.extend(local_diagnostics)
+
+    def _declare_variables(self, scope_id: int, names) -> None:
+        """Declare global/main variable `names` in one declare_many call and report duplicates."""
+        st = self.symbol_table
+        rejected = st.declare_many(scope_id, [SymbolTableEntry(name, 'var', scope_id, self._proxy_id()) for name in names])
+        if rejected:
+            path = st.get_scope_path(scope_id)
+            self.diagnostics.extend(
+                Diagnostic(kind='DuplicateName', message=message, node_id=entry.decl_node_id, scope_path=path)
+                for entry, message in rejected
             )
-            try:
-                self.symbol_table.declare(main_id, entry)
-            except ValueError as e:
-                self.diagnostics.append(Diagnostic(kind='DuplicateName', message=str(e), node_id=entry.decl_node_id, scope_path=self.symbol_table.get_scope_path(main_id)))
-
 
-    def _check_cross_category_clashes(self) -> None:
+    def _build_local_scope(self, defn, what: str, diagnostics: List[Diagnostic]) -> None:
         """
-        Enforce that no variable name (global or main) equals any proc/func name.
-
-        M2 DONE:
-        This is the "Everywhere" level check mentioned in the spec.
-        After collecting all declarations, check that:
-        - No global variable name matches any proc name
-        - No global variable name matches any func name
-        - No main variable name matches any proc name
-        - No main variable name matches any func name
-
-        Example:
-            global_id = self.symbol_table.base_scopes['global']
-            proc_id = self.symbol_table.base_scopes['procedure']
-            func_id = self.symbol_table.base_scopes['function']
-
-            global_scope = self.symbol_table.get_scope(global_id)
-            proc_scope = self.symbol_table.get_scope(proc_id)
-            func_scope = self.symbol_table.get_scope(func_id)
-
-            for var_name in global_scope.all_names():
-                if var_name in proc_scope.all_names():
-                    self.diagnostics.append(
-                        f"Variable '{var_name}' conflicts with procedure name"
-                    )
-                if var_name in func_scope.all_names():
-                    self.diagnostics.append(
-                        f"Variable '{var_name}' conflicts with function name"
-                    )
+        Create the Local scope of a ProcDef/FuncDef (`what` is 'proc' or 'func')
+        under Global, record it in self.local_scopes and declare its params
+        (kind='param') and locals (kind='var'), appending problems to `diagnostics`.
+        Enforced: no duplicate params, no duplicate locals, no local shadowing a param.
         """
-        global_id = self.symbol_table.base_scopes['global']
-        main_id   = self.symbol_table.base_scopes['main']
-        proc_id   = self.symbol_table.base_scopes['procedure']
-        func_id   = self.symbol_table.base_scopes['function']
-        global_scope = self.symbol_table.get_scope(global_id)
-        main_scope   = self.symbol_table.get_scope(main_id)
-        proc_scope   = self.symbol_table.get_scope(proc_id)
-        func_scope   = self.symbol_table.get_scope(func_id)
-        proc_names = proc_scope.all_names()
-        func_names = func_scope.all_names()
-        for var_name in global_scope.all_names():
-            if var_name in proc_names:
-                self.diagnostics.append(Diagnostic(
-                    kind='CrossCategoryClash',
-                    message=f"Variable '{var_name}' conflicts with procedure name",
-                    node_id=-1,
-                    scope_path=self.symbol_table.get_scope_path(global_id)
-                ))
-            if var_name in func_names:
-                self.diagnostics.append(Diagnostic(
-                    kind='CrossCategoryClash',
-                    message=f"Variable '{var_name}' conflicts with function name",
-                    node_id=-1,
-                    scope_path=self.symbol_table.get_scope_path(global_id)
-                ))
-        for var_name in main_scope.all_names():
-            if var_name in proc_names:
-                self.diagnostics.append(Diagnostic(
-                    kind='CrossCategoryClash',
-                    message=f"Main variable '{var_name}' conflicts with procedure name",
-                    node_id=-1,
-                    scope_path=self.symbol_table.get_scope_path(main_id)
-                ))
-            if var_name in func_names:
-                self.diagnostics.append(Diagnostic(
-                    kind='CrossCategoryClash',
-                    message=f"Main variable '{var_name}' conflicts with function name",
-                    node_id=-1,
-                    scope_path=self.symbol_table.get_scope_path(main_id)
+        st = self.symbol_table
+        name = defn.name
+        local_id = st.new_scope('Local', self._global_id, name=f'Local:{name}')
+        self.local_scopes[name] = local_id
+        # Params, then locals, each declared in one declare_many call; names
+        # already in the table (repeats, or locals reusing a param) come back
+        # rejected and are reported in declaration order.
+        table = st.get_scope(local_id).table
+        proxy = self._proxy_id
+        rejected = st.declare_many(local_id, [SymbolTableEntry(param, 'param', local_id, proxy()) for param in defn.params])
+        path = st.get_scope_path(local_id) if rejected else None  # scope path, built only if needed
+        for entry, message in rejected:
+            diagnostics.append(Diagnostic(
+                kind='DuplicateName',
+                message=f"Duplicate parameter '{entry.name}' in {what} '{name}'",
+                node_id=entry.decl_node_id,
+                scope_path=path
+            ))
+            diagnostics.append(Diagnostic(kind='DuplicateName', message=message, node_id=entry.decl_node_id, scope_path=path))
+        rejected = st.declare_many(local_id, [SymbolTableEntry(local, 'var', local_id, proxy()) for local in defn.body.locals])
+        if rejected:
+            path = path or st.get_scope_path(local_id)
+        for entry, message in rejected:
+            if table[entry.name].kind == 'param':
+                diagnostics.append(Diagnostic(
+                    kind='ParamShadowed',
+                    message=f"Local variable '{entry.name}' shadows parameter in {what} '{name}'",
+                    node_id=entry.decl_node_id,
+                    scope_path=path
                 ))
-
-    def _build_local_scopes(self) -> None:
-        """
-        For each proc/func definition, create a Local scope and populate it.
-
-        M2 DONE:
-        1. For each ProcDef in self.ast.procs:
-           a. Create a new Local scope with parent = Global scope
-           b. Insert parameters (kind='param', use proxy node_ids)
-           c. Insert locals from body (kind='var', use proxy node_ids)
-           d. Enforce: no duplicate params, no duplicate locals
-           e. Enforce: locals cannot shadow params (same name is illegal)
-           f. Store the local scope ID in self.local_scopes[pdef.name]
-
-        2. Repeat for each FuncDef in self.ast.funcs
-
-        Example:
-            global_id = self.symbol_table.base_scopes['global']
-
-            for pdef in self.ast.procs:
-                # Create local scope
-                local_id = self.symbol_table.new_scope(
-                    kind='Local',
-                    parent_id=global_id,
-                    name=f'Local:{pdef.name}'
-                )
-                self.local_scopes[pdef.name] = local_id
-
-                # Insert parameters
-                param_names = set()
-                for idx, param in enumerate(pdef.params):
-                    if param in param_names:
-                        self.diagnostics.append(
-                            f"Duplicate parameter '{param}' in proc '{pdef.name}'"
-                        )
-                    param_names.add(param)
-
-                    entry = SymbolTableEntry(
-                        name=param,
-                        kind='param',
-                        scope_id=local_id,
-                        decl_node_id=pdef.node_id + idx + 1  # proxy
-                    )
-                    try:
-                        self.symbol_table.declare(local_id, entry)
-                    except ValueError as e:
-                        self.diagnostics.append(str(e))
-
-                # Insert locals
-                for idx, local in enumerate(pdef.body.locals):
-                    if local in param_names:
-                        self.diagnostics.append(
-                            f"Local variable '{local}' shadows parameter in proc '{pdef.name}'"
-                        )
-
-                    entry = SymbolTableEntry(
-                        name=local,
-                        kind='var',
-                        scope_id=local_id,
-                        decl_node_id=pdef.body.node_id + idx + 1  # proxy
-                    )
-                    try:
-                        self.symbol_table.declare(local_id, entry)
-                    except ValueError as e:
-                        self.diagnostics.append(str(e))
-        """
-        global_id = self.symbol_table.base_scopes['global']
-
-        # Procedures
-        for pdef in self.ast.procs:
-            local_id = self.symbol_table.new_scope('Local', global_id, name=f'Local:{pdef.name}')
-            self.local_scopes[pdef.name] = local_id
-            # params
-            seen = set()
-            for idx, param in enumerate(pdef.params):
-                if param in seen:
-                    self.diagnostics.append(Diagnostic(
-                        kind='DuplicateName',
-                        message=f"Duplicate parameter '{param}' in proc '{pdef.name}'",
-                        node_id=self._proxy_id(pdef.node_id, f"proc:{pdef.name}:param", idx),
-                        scope_path=self.symbol_table.get_scope_path(local_id)
-                    ))
-                seen.add(param)
-                entry = SymbolTableEntry(
-                    name=param, kind='param', scope_id=local_id,
-                    decl_node_id=self._proxy_id(pdef.node_id, f"proc:{pdef.name}:param", idx)
-                )
-                try:
-                    self.symbol_table.declare(local_id, entry)
-                except ValueError as e:
-                    self.diagnostics.append(Diagnostic(kind='DuplicateName', message=str(e), node_id=entry.decl_node_id, scope_path=self.symbol_table.get_scope_path(local_id)))
-            # locals
-            for idx, local in enumerate(pdef.body.locals):
-                if local in seen:
-                    self.diagnostics.append(Diagnostic(
-                        kind='ParamShadowed',
-                        message=f"Local variable '{local}' shadows parameter in proc '{pdef.name}'",
-                        node_id=self._proxy_id(pdef.body.node_id, f"proc:{pdef.name}:local", idx),
-                        scope_path=self.symbol_table.get_scope_path(local_id)
-                    ))
-                entry = SymbolTableEntry(
-                    name=local, kind='var', scope_id=local_id,
-                    decl_node_id=self._proxy_id(pdef.body.node_id, f"proc:{pdef.name}:local", idx)
-                )
-                try:
-                    self.symbol_table.declare(local_id, entry)
-                except ValueError as e:
-                    self.diagnostics.append(Diagnostic(kind='DuplicateName', message=str(e), node_id=entry.decl_node_id, scope_path=self.symbol_table.get_scope_path(local_id)))
-
-        # Functions
-        for fdef in self.ast.funcs:
-            local_id = self.symbol_table.new_scope('Local', global_id, name=f'Local:{fdef.name}')
-            self.local_scopes[fdef.name] = local_id
-            # params
-            seen = set()
-            for idx, param in enumerate(fdef.params):
-                if param in seen:
-                    self.diagnostics.append(Diagnostic(
-                        kind='DuplicateName',
-                        message=f"Duplicate parameter '{param}' in func '{fdef.name}'",
-                        node_id=self._proxy_id(fdef.node_id, f"func:{fdef.name}:param", idx),
-                        scope_path=self.symbol_table.get_scope_path(local_id)
-                    ))
-                seen.add(param)
-                entry = SymbolTableEntry(
-                    name=param, kind='param', scope_id=local_id,
-                    decl_node_id=self._proxy_id(fdef.node_id, f"func:{fdef.name}:param", idx)
-                )
-                try:
-                    self.symbol_table.declare(local_id, entry)
-                except ValueError as e:
-                    self.diagnostics.append(Diagnostic(kind='DuplicateName', message=str(e), node_id=entry.decl_node_id, scope_path=self.symbol_table.get_scope_path(local_id)))
-            # locals
-            for idx, local in enumerate(fdef.body.locals):
-                if local in seen:
-                    self.diagnostics.append(Diagnostic(
-                        kind='ParamShadowed',
-                        message=f"Local variable '{local}' shadows parameter in func '{fdef.name}'",
-                        node_id=self._proxy_id(fdef.body.node_id, f"func:{fdef.name}:local", idx),
-                        scope_path=self.symbol_table.get_scope_path(local_id)
-                    ))
-                entry = SymbolTableEntry(
-                    name=local, kind='var', scope_id=local_id,
-                    decl_node_id=self._proxy_id(fdef.body.node_id, f"func:{fdef.name}:local", idx)
-                )
-                try:
-                    self.symbol_table.declare(local_id, entry)
-                except ValueError as e:
-                    self.diagnostics.append(Diagnostic(kind='DuplicateName', message=str(e), node_id=entry.decl_node_id, scope_path=self.symbol_table.get_scope_path(local_id)))
+            diagnostics.append(Diagnostic(kind='DuplicateName', message=message, node_id=entry.decl_node_id, scope_path=path))
 
 
     # ========================================================================
@@ -494,9 +263,7 @@ class ScopeChecker:
                     node_id=pdef.node_id
                 ))
                 continue
-            # pdef.body.algo might be the algo object
-            if getattr(pdef, 'body', None) and getattr(pdef.body, 'algo', None):
-                self._resolve_algo(pdef.body.algo, local_scope_id, owner_name=pdef.name, owner_kind='proc')
+            self._resolve_algo(pdef.body.algo, local_scope_id, owner_name=pdef.name, owner_kind='proc')
 
         # Funcs
         for fdef in self.ast.funcs:
@@ -508,109 +275,62 @@ class ScopeChecker:
                     node_id=fdef.node_id
                 ))
                 continue
-            if getattr(fdef, 'body', None) and getattr(fdef.body, 'algo', None):
-                self._resolve_algo(fdef.body.algo, local_scope_id, owner_name=fdef.name, owner_kind='func')
+            self._resolve_algo(fdef.body.algo, local_scope_id, owner_name=fdef.name, owner_kind='func')
 
         # Main
-        main_scope = self.symbol_table.base_scopes['main']
-        if getattr(self.ast, 'main', None) and getattr(self.ast.main, 'algo', None):
-            self._resolve_algo(self.ast.main.algo, main_scope, owner_name='main', owner_kind='main')
+        self._resolve_algo(self.ast.main.algo, self._main_id, owner_name='main', owner_kind='main')
+
+    def _resolve_call_args(self, call: Any, scope_id: int) -> None:
+        """Resolve the arguments of a Call, whether it is a proc call or the rhs of an Assign."""
+        for arg in call.args:
+            # arg may be an Atom/Term/VarRef
+            if isinstance(arg, VarRef):
+                self._resolve_varref(arg, scope_id)
+            else:
+                # if arg is Term-like, attempt to resolve inside
+                self._resolve_term(arg, scope_id)
 
     def _resolve_algo(self, algo: Any, scope_id: int, owner_name: Optional[str] = None, owner_kind: Optional[str] = None) -> None:
         """
         Walk instructions in an Algo and resolve any VarRefs inside.
-        This function is defensive about field names for the instruction list.
+        Fields are read directly: astnodes is the one AST definition.
         """
-        instrs = getattr(algo, 'instrs', None) or getattr(algo, 'stmts', None) or getattr(algo, 'statements', None)
-        if instrs is None:
-            # Nothing to do
-            return
+        for instr in algo.instrs:
+            itype = type(instr)
+            # ASSIGN: 'var' (a name string) and 'rhs' (Term or Call)
+            if itype is Assign:
+                rhs = instr.rhs
+                # Call can appear as rhs (function call returning a value)
+                if isinstance(rhs, Call):
+                    self._resolve_call_args(rhs, scope_id)
+                else:
+                    self._resolve_term(rhs, scope_id)
 
-        for instr in instrs:
-            # Detect types by class names to stay robust to small AST naming differences
-            itype = type(instr).__name__
-            # ASSIGN: typically has 'lhs' (string/name) and 'rhs' (Term or Call)
-            if itype in ('Assign', 'Assignment'):
-                # resolve RHS (term or call)
-                rhs = getattr(instr, 'rhs', None)
-                if rhs is not None:
-                    # Call can appear as rhs (function call returning a value)
-                    if type(rhs).__name__ in ('Call',):
-                        # call args may be VarRef or Terms
-                        for arg in getattr(rhs, 'args', []):
-                            # arg may be an Atom/Term/VarRef
-                            if isinstance(arg, VarRef):
-                                self._resolve_varref(arg, scope_id)
-                            else:
-                                # if arg is Term-like, attempt to resolve inside
-                                self._resolve_term(arg, scope_id)
-                    else:
-                        self._resolve_term(rhs, scope_id)
-                # Optionally resolve LHS if it's a VarRef object (some ASTs use VarRef)
-                lhs = getattr(instr, 'lhs', None)
-                if isinstance(lhs, VarRef):
-                    self._resolve_varref(lhs, scope_id)
-
-            # PRINT: may have expression or varref
-            elif itype == 'Print':
-                out = getattr(instr, 'expr', None) or getattr(instr, 'output', None)
+            # PRINT: output is a VarRef or a literal
+            elif itype is Print:
+                out = instr.output
                 if isinstance(out, VarRef):
                     self._resolve_varref(out, scope_id)
                 else:
                     self._resolve_term(out, scope_id)
 
             # CALL (proc call) - resolve argument terms
-            elif itype == 'Call':
-                for arg in getattr(instr, 'args', []):
-                    if isinstance(arg, VarRef):
-                        self._resolve_varref(arg, scope_id)
-                    else:
-                        self._resolve_term(arg, scope_id)
+            elif itype is Call:
+                self._resolve_call_args(instr, scope_id)
 
             # LOOPS
-            elif itype in ('LoopWhile', 'LoopDoUntil', 'WhileLoop', 'DoUntilLoop'):
-                cond = getattr(instr, 'cond', None)
-                if cond is not None:
-                    self._resolve_term(cond, scope_id)
-                body = getattr(instr, 'body', None)
-                if body is not None:
-                    self._resolve_algo(body, scope_id, owner_name, owner_kind)
+            elif itype is LoopWhile or itype is LoopDoUntil:
+                self._resolve_term(instr.cond, scope_id)
+                self._resolve_algo(instr.body, scope_id, owner_name, owner_kind)
 
             # BRANCH / IF
-            elif itype in ('BranchIf', 'If', 'IfThen'):
-                cond = getattr(instr, 'cond', None)
-                if cond is not None:
-                    self._resolve_term(cond, scope_id)
-                then_block = getattr(instr, 'then_', None) or getattr(instr, 'then', None)
-                if then_block is not None:
-                    self._resolve_algo(then_block, scope_id, owner_name, owner_kind)
-                else_block = getattr(instr, 'else_', None) or getattr(instr, 'else', None)
-                if else_block is not None:
-                    self._resolve_algo(else_block, scope_id, owner_name, owner_kind)
-
-            # HALT, RETURN, or other simple instructions - may contain terms in some ASTs
-            else:
-                # Best-effort: inspect attributes for Terms and resolve them
-                for attr_name in dir(instr):
-                    if attr_name.startswith('_'):
-                        continue
-                    try:
-                        attr = getattr(instr, attr_name)
-                    except Exception:
-                        continue
-                    # If attribute looks like a Term or VarRef, resolve it
-                    if isinstance(attr, VarRef):
-                        self._resolve_varref(attr, scope_id)
-                    elif type(attr).__name__ in ('Term', 'TermAtom', 'TermUn', 'TermBin'):
-                        self._resolve_term(attr, scope_id)
-                    # if it's an iterable of terms/varrefs, check the items
-                    elif isinstance(attr, (list, tuple)):
-                        for item in attr:
-                            if isinstance(item, VarRef):
-                                self._resolve_varref(item, scope_id)
-                            elif type(item).__name__ in ('Term', 'TermAtom', 'TermUn', 'TermBin'):
-                                self._resolve_term(item, scope_id)
-                # end best-effort
+            elif itype is BranchIf:
+                self._resolve_term(instr.cond, scope_id)
+                self._resolve_algo(instr.then_, scope_id, owner_name, owner_kind)
+                if instr.else_ is not None:
+                    self._resolve_algo(instr.else_, scope_id, owner_name, owner_kind)
+
+            # HALT has nothing to resolve
 
     def _resolve_varref(self, varref: VarRef, scope_id: int) -> None:
         """
@@ -622,7 +342,7 @@ class ScopeChecker:
         """
         if varref is None:
             return
-        name = getattr(varref, 'name', None)
+        name = varref.name
         if not name:
             return
 
@@ -639,15 +359,13 @@ class ScopeChecker:
             entry = self.symbol_table.lookup_chain(scope_id, name)
 
         if entry is None:
-            main_id   = self.symbol_table.base_scopes['main']
-            global_id = self.symbol_table.base_scopes['global']
-            if scope_id == main_id:
-                entry = self.symbol_table.lookup_local(global_id, name)
+            if scope_id == self._main_id:
+                entry = self.symbol_table.lookup_local(self._global_id, name)
         else:
             # attach resolved
-            setattr(varref, 'resolved', entry)
+            varref.resolved = entry
             # record use→decl mapping if we have node ids
-            vid = getattr(varref, 'node_id', -1)
+            vid = varref.node_id
             if vid is not None and vid != -1:
                 try:
                     self.uses_to_decls[vid] = int(entry.decl_node_id)
@@ -662,58 +380,71 @@ class ScopeChecker:
         """
         if term is None:
             return
-        tname = type(term).__name__
+        ttype = type(term)
 
-        if tname == 'TermAtom':
-            atom = getattr(term, 'atom', None)
+        if ttype is TermAtom:
+            atom = term.atom
             if isinstance(atom, VarRef):
                 self._resolve_varref(atom, scope_id)
             # numbers/strings ignored
-        elif tname == 'TermUn':
-            inner = getattr(term, 'term', None) or getattr(term, 'inner', None)
-            if inner is not None:
-                self._resolve_term(inner, scope_id)
-        elif tname == 'TermBin':
-            left = getattr(term, 'left', None)
-            right = getattr(term, 'right', None)
-            if left is not None:
-                self._resolve_term(left, scope_id)
-            if right is not None:
-                self._resolve_term(right, scope_id)
-        else:
-            # Best-effort: if term has attributes that look like sub-terms, walk them
-            # to be robust to minor AST naming differences.
-            for attr_name in dir(term):
-                if attr_name.startswith('_'):
-                    continue
-                try:
-                    attr = getattr(term, attr_name)
-                except Exception:
-                    continue
-                if isinstance(attr, VarRef):
-                    self._resolve_varref(attr, scope_id)
-                elif type(attr).__name__ in ('Term', 'TermAtom', 'TermUn', 'TermBin'):
-                    self._resolve_term(attr, scope_id)
-                elif isinstance(attr, (list, tuple)):
-                    for item in attr:
-                        if isinstance(item, VarRef):
-                            self._resolve_varref(item, scope_id)
-                        elif type(item).__name__ in ('Term', 'TermAtom', 'TermUn', 'TermBin'):
-                            self._resolve_term(item, scope_id)
+        elif ttype is TermUn:
+            self._resolve_term(term.term, scope_id)
+        elif ttype is TermBin:
+            self._resolve_term(term.left, scope_id)
+            self._resolve_term(term.right, scope_id)
+        # atoms passed directly (literals in print/call args) hold no VarRef to resolve
+
+    def _resolve_with(self, declared: Tuple[SymbolTable, Dict[str, int], Tuple[Optional[int], ...]]) -> SymbolTable:
+        """
+        Skip M1/M2: adopt the symbol table, local scopes and base scope ids that
+        an earlier check built for the same declarations (see check_scopes),
+        then resolve this AST's uses against them.
+        """
+        self.symbol_table, self.local_scopes, base_ids = declared
+        self._global_id, self._proc_id, self._func_id, self._main_id = base_ids
+        self._resolve_uses()
+        return self.symbol_table
 
 # ---------- helpers ----------
-    def _proxy_id(self, anchor_node_id: int, bucket: str, idx: int) -> int:
+    def _proxy_id(self) -> int:
         """
-        Deterministic stand-in for decl_node_id when a declaration is a bare string
-        (globals, params, locals, main variables). Keep it simple & consistent.
+        Stand-in for decl_node_id when a declaration is a bare string (globals,
+        params, locals, main variables): the next number from a counter that
+        starts above any real node_id, so proxies are unique and never collide.
         """
-        bucket_code = (abs(hash(bucket)) & 0xFF)  # short code from bucket name
-        return anchor_node_id * 1000 + bucket_code * 10 + (idx + 1)
+        self._proxy_counter += 1
+        return self._proxy_counter
+
+# Declarations already checked by check_scopes: declaration key -> (symbol
+# table, local scopes, base scope ids), least recently used first
+_scope_cache: "OrderedDict[bytes, Tuple[SymbolTable, Dict[str, int], Tuple[Optional[int], ...]]]" = OrderedDict()
+SCOPE_CACHE_SIZE = 32
+
+
+def _declaration_key(ast: Program) -> bytes:
+    """
+    Digest of everything the symbol table is built from: globals, proc/func
+    names, node_ids, params and locals, and main variables. ALGO blocks are
+    left out since they only affect resolution, which is redone on every call.
+    """
+    decls = (
+        tuple(ast.globals),
+        [(d.name, d.node_id, tuple(d.params), tuple(d.body.locals)) for d in ast.procs],
+        [(d.name, d.node_id, tuple(d.params), tuple(d.body.locals)) for d in ast.funcs],
+        tuple(ast.main.variables),
+    )
+    return hashlib.blake2b(repr(decls).encode(), digest_size=8).digest()
+
 
 def check_scopes(ast: Program) -> SymbolTable:
     """
     Convenience function: run scope checking on an AST.
 
+    Repeated calls on ASTs with identical declarations (e.g. re-checking an
+    edited file whose edits only touched ALGO blocks) reuse the cached symbol
+    table and only resolve uses again. The returned table may therefore be
+    shared between calls and must be treated as read-only.
+
     Args:
         ast: Program node with node_ids assigned
 
@@ -734,8 +465,17 @@ def check_scopes(ast: Program) -> SymbolTable:
         st = check_scopes(ast)
         print(st.pretty_print())
     """
+    key = _declaration_key(ast)
     checker = ScopeChecker(ast)
-    return checker.check()
+    declared = _scope_cache.get(key)
+    if declared is not None:
+        _scope_cache.move_to_end(key)
+        return checker._resolve_with(declared)
+    st = checker.check()
+    _scope_cache[key] = (st, checker.local_scopes, (checker._global_id, checker._proc_id, checker._func_id, checker._main_id))
+    if len(_scope_cache) > SCOPE_CACHE_SIZE:
+        _scope_cache.popitem(last=False)
+    return st
 
 
 
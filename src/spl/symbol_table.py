@@ -18,11 +18,11 @@ SPL Scope Structure:
         └── Local:name (parameters + locals)
 """
 
-from typing import Dict, List, Optional, Set
+from typing import Dict, List, Optional, Set, Tuple
 from dataclasses import dataclass, field
 
 
-@dataclass
+@dataclass(slots=True)
 class SymbolTableEntry:
     """
     A single declared identifier in the symbol table.
@@ -44,7 +44,7 @@ class SymbolTableEntry:
         return f"Entry({self.kind} '{self.name}' @ scope#{self.scope_id}, node#{self.decl_node_id})"
 
 
-@dataclass
+@dataclass(slots=True)
 class Scope:
     """
     A single scope (namespace) in the program.
@@ -70,12 +70,16 @@ class Scope:
             ValueError: If the name already exists in this scope
         """
         if entry.name in self.table:
-            existing = self.table[entry.name]
-            raise ValueError(
-                f"Duplicate declaration of '{entry.name}' in {self.kind} scope "
-                f"(previous @ node#{existing.decl_node_id}, current @ node#{entry.decl_node_id})"
-            )
+            raise ValueError(self.duplicate_message(entry))
         self.table[entry.name] = entry
+
+    def duplicate_message(self, entry: SymbolTableEntry) -> str:
+        """Message for declaring `entry` when its name is already in this scope."""
+        existing = self.table[entry.name]
+        return (
+            f"Duplicate declaration of '{entry.name}' in {self.kind} scope "
+            f"(previous @ node#{existing.decl_node_id}, current @ node#{entry.decl_node_id})"
+        )
     
     def lookup_local(self, name: str) -> Optional[SymbolTableEntry]:
         """Look up a name only in this scope (no parent chain)."""
@@ -164,6 +168,33 @@ class SymbolTable:
         # Maintain reverse lookup by declaration node
         self.nodes[entry.decl_node_id] = entry
     
+    def declare_many(self, scope_id: int, entries: List[SymbolTableEntry]) -> List[Tuple[SymbolTableEntry, str]]:
+        """
+        Declare several names in one scope, in order, without raising.
+
+        Args:
+            scope_id: ID of scope to declare in
+            entries: The entries to add
+
+        Returns:
+            (entry, duplicate message) for each entry whose name was already
+            declared (in the scope or earlier in `entries`); the rest are added
+
+        Raises:
+            KeyError: If scope_id doesn't exist
+        """
+        scope = self.get_scope(scope_id)
+        table = scope.table
+        nodes = self.nodes
+        rejected = []
+        for entry in entries:
+            if entry.name in table:
+                rejected.append((entry, scope.duplicate_message(entry)))
+            else:
+                table[entry.name] = entry
+                nodes[entry.decl_node_id] = entry
+        return rejected
+
     def lookup_local(self, scope_id: int, name: str) -> Optional[SymbolTableEntry]:
         """
         Look up a name only in the specified scope (no parent traversal).
@@ -238,6 +269,11 @@ class SymbolTable:
         lines.append("SYMBOL TABLE")
         lines.append("=" * 70)
         
+        # parent → child scope ids, built once (instead of rescanning all scopes per scope)
+        children_of: Dict[Optional[int], List[int]] = {}
+        for sid, s in self.scopes.items():
+            children_of.setdefault(s.parent_id, []).append(sid)
+        
         def print_scope(scope_id: int, indent: int = 0) -> None:
             scope = self.get_scope(scope_id)
             prefix = "  " * indent
@@ -258,13 +294,11 @@ class SymbolTable:
                 lines.append(f"{prefix}  (empty)")
             
             # Children scopes
-            children = [sid for sid, s in self.scopes.items() if s.parent_id == scope_id]
-            for child_id in sorted(children):
+            for child_id in sorted(children_of.get(scope_id, ())):
                 print_scope(child_id, indent + 1)
         
         # Find root scope(s) (parent_id == None)
-        roots = [sid for sid, s in self.scopes.items() if s.parent_id is None]
-        for root_id in roots:
+        for root_id in children_of.get(None, ()):
             print_scope(root_id)
         
         lines.append("=" * 70)
@@ -1,8 +1,8 @@
 # tokens.py
-from enum import Enum, auto
+from enum import IntEnum, auto
 from dataclasses import dataclass
 
-class T(Enum):
+class T(IntEnum): # int-valued tags: usable directly as array/dict keys next to plain ints
     # punctuation
     LBRACE=auto(); RBRACE=auto(); LPAREN=auto(); RPAREN=auto(); SEMI=auto(); ASSIGN=auto()
     # keywords
@@ -19,9 +19,10 @@ KEYWORDS = {
   "neg":T.NEG,"not":T.NOT,"eq":T.EQ,"or":T.OR,"and":T.AND,"plus":T.PLUS,"minus":T.MINUS,"mult":T.MULT,"div":T.DIV,
 }
 
-@dataclass
+@dataclass(slots=True) # no per-token __dict__: smaller tokens, faster field access
 class Token:
     typ: T
     lexeme: str
     line: int
     col: int
+    value: int | None = None # NUMBER tokens: the literal already converted by the lexer
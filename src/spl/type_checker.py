@@ -2,6 +2,8 @@
 from .astnodes import *
 from typing import Dict, List, Optional, Union
 
+_ARITH_OPS = frozenset({"plus", "minus", "mult", "div"})
+
 
 class TypeChecker:
     """
@@ -244,7 +246,7 @@ class TypeChecker:
     def visit_TermBin(self, node: TermBin):
         lt = self.visit(node.left)
         rt = self.visit(node.right)
-        if node.op in ("plus", "minus", "mult", "div"):
+        if node.op in _ARITH_OPS:
             if lt != "numeric" or rt != "numeric":
                 raise Exception(f"Binary '{node.op}' requires numeric operands")
             return "numeric"
@@ -0,0 +1,72 @@
+# tests/test_ast_cache.py
+import os
+
+import pytest
+
+from spl.ast_cache import parse_cached, cache_path
+from spl.parser import Parser
+
+SRC = "glob { x } proc { } func { } main { var { } x = (x plus 1) }"
+
+
+def test_parse_cached_roundtrip(tmp_path):
+    src = tmp_path / "prog.spl"
+    src.write_text(SRC)
+    cache_dir = str(tmp_path / "cache")
+
+    first = parse_cached(str(src), SRC, cache_dir)
+    assert first == Parser(SRC).parse()
+    assert (tmp_path / "cache").exists()
+
+    # second call loads the pickle instead of re-parsing
+    second = parse_cached(str(src), SRC, cache_dir)
+    assert second == first and second is not first
+
+
+def test_cache_key_depends_on_text(tmp_path):
+    path = str(tmp_path / "prog.spl")
+    assert cache_path(path, SRC, "c") != cache_path(path, SRC + " ", "c")
+
+
+def test_cache_key_depends_on_version(tmp_path, monkeypatch):
+    import spl.ast_cache as ast_cache
+    path = str(tmp_path / "prog.spl")
+    before = cache_path(path, SRC, "c")
+    monkeypatch.setattr(ast_cache, "CACHE_VERSION", ast_cache.CACHE_VERSION + 1)
+    assert cache_path(path, SRC, "c") != before
+
+
+def test_unpicklable_ast_is_returned_and_not_cached(tmp_path):
+    term = "x"
+    for _ in range(3000):  # too deep for pickle's recursion
+        term = f"( {term} plus 1 )"
+    text = f"glob {{ x }} proc {{ }} func {{ }} main {{ var {{ }} x = {term} }}"
+    src = tmp_path / "deep.spl"
+    src.write_text(text)
+    cache_dir = tmp_path / "cache"
+
+    ast = parse_cached(str(src), text, str(cache_dir))
+    assert ast.main.algo.instrs[0].var == "x"
+    assert list(cache_dir.iterdir()) == []  # no partial .pkl or temp file left behind
+
+
+def test_default_cache_dir_is_per_user(monkeypatch, tmp_path):
+    from spl.ast_cache import default_cache_dir
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    assert default_cache_dir() == str(tmp_path / "spl")
+
+
+@pytest.mark.skipif(not hasattr(os, "getuid"), reason="POSIX permissions")
+def test_shared_cache_dir_is_never_loaded(tmp_path):
+    import pickle
+    src = tmp_path / "prog.spl"
+    src.write_text(SRC)
+    cache_dir = tmp_path / "shared"
+    cache_dir.mkdir()
+    os.chmod(cache_dir, 0o777)  # anyone could have planted an entry here
+    planted = cache_path(str(src), SRC, str(cache_dir))
+    with open(planted, "wb") as f:
+        pickle.dump(("planted",), f)
+
+    assert parse_cached(str(src), SRC, str(cache_dir)) == Parser(SRC).parse()
+    assert os.listdir(cache_dir) == [os.path.basename(planted)]  # nothing written there either
@@ -0,0 +1,18 @@
+# tests/test_basicify.py
+from spl.basicify import intermediate_to_basic
+
+
+def test_labels_resolve_forward_and_backward():
+    out = intermediate_to_basic(["REM L1", "x = 1", "", "IF x > 0 THEN L2", "GOTO L1", "REM L2", "GOTO X9"])
+    assert out == ["10 REM L1", "20 x = 1", "30 IF x > 0 THEN 50", "40 GOTO 10", "50 REM L2", "60 GOTO X9"]
+
+
+def test_codegen_to_basic_matches_basicify(tmp_path):
+    import os
+    from spl.parser import Parser
+    from spl.codegen import CodeGenerator
+    for name in ("richer.spl", "rich.spl", "demo.spl"):
+        text = open(os.path.join(os.path.dirname(__file__), "..", "examples", name), encoding="utf-8").read()
+        cg = CodeGenerator(Parser(text).parse())
+        cg.generate(str(tmp_path / "out.int.txt"))
+        assert cg.to_basic() == intermediate_to_basic(cg.output)
@@ -0,0 +1,136 @@
+# tests/test_codegen.py
+import pytest
+
+from spl.parser import Parser
+from spl.codegen import CodeGenerator
+
+SRC = """
+glob { }
+proc {
+  shout(a) { local { } print a; print a; print a }
+}
+func { }
+main {
+  var { x }
+  x = 1;
+  shout(x);
+  shout(x);
+  halt
+}
+"""
+
+
+def gen(tmp_path, **kw):
+    cg = CodeGenerator(Parser(SRC).parse(), **kw)
+    cg.generate(str(tmp_path / "out.int.txt"))
+    return cg.output
+
+
+def test_inlines_everything_by_default(tmp_path):
+    out = gen(tmp_path)
+    assert out.count("REM INLINE PROC shout") == 2
+    assert not any(line.startswith("CALL") for line in out)
+
+
+def test_inline_budget_keeps_large_multi_call_bodies_out_of_line(tmp_path):
+    assert gen(tmp_path, inline_budget=2).count("CALL shout x") == 2
+    assert gen(tmp_path, inline_budget=3).count("REM INLINE PROC shout") == 2
+
+
+def test_inline_budget_counts_statements_and_is_not_executable(tmp_path):
+    src = """
+glob { } proc { }
+func {
+  inc(a) { local { r } r = ( a plus 1 ) ; return r }
+  twice(a) { local { r } r = inc(a) ; r = inc(r) ; return r }
+}
+main {
+  var { x }
+  x = twice(1);
+  x = twice(x);
+  halt
+}
+"""
+    cg = CodeGenerator(Parser(src).parse(), inline_budget=2)
+    cg.generate(str(tmp_path / "out.int.txt"))
+    # twice has two statements (the Calls inside its assignments are not counted)
+    assert cg.output.count("REM INLINE FUNC twice") == 2
+    assert not any("CALL" in line for line in cg.output)
+
+    cg = CodeGenerator(Parser(src).parse(), inline_budget=1)
+    cg.generate(str(tmp_path / "out.int.txt"))
+    assert cg.output.count("x = CALL twice 1") == 1
+    with pytest.raises(ValueError, match="twice"):
+        cg.to_basic()
+
+
+def test_literal_arithmetic_is_folded(tmp_path):
+    src = """
+glob { } proc { } func { }
+main {
+  var { x }
+  x = ( ( 3 plus 4 ) mult 2 );
+  x = ( 7 div 2 );
+  x = ( x plus 1 );
+  halt
+}
+"""
+    cg = CodeGenerator(Parser(src).parse())
+    cg.generate(str(tmp_path / "out.int.txt"))
+    assert "x = 14" in cg.output
+    assert "x = 7 / 2" in cg.output  # inexact division is left to BASIC
+    assert "x = x + 1" in cg.output
+
+
+def test_neg_of_negative_operand_is_parenthesized(tmp_path):
+    src = """
+glob { } proc { } func { }
+main {
+  var { x }
+  x = ( neg ( 2 minus 3 ) );
+  x = ( neg ( neg x ) );
+  halt
+}
+"""
+    cg = CodeGenerator(Parser(src).parse())
+    cg.generate(str(tmp_path / "out.int.txt"))
+    assert "x = -(-1)" in cg.output
+    assert "x = -(-x)" in cg.output
+    assert not any("--" in line for line in cg.output)
+
+
+def test_or_chain_needs_no_mid_labels(tmp_path):
+    src = """
+glob { } proc { } func { }
+main {
+  var { x }
+  x = 1;
+  if ( ( x > 1 ) or ( ( x > 2 ) or ( x > 3 ) ) ) { print x } else { halt }
+}
+"""
+    cg = CodeGenerator(Parser(src).parse())
+    cg.generate(str(tmp_path / "out.int.txt"))
+    tests = [line for line in cg.output if line.startswith("IF ")]
+    assert len(tests) == 3
+    assert [t.split(" THEN ")[1] for t in tests] == [tests[0].split(" THEN ")[1]] * 3
+    assert not any(line.startswith("REM OR") for line in cg.output)
+
+
+def test_or_chain_not_operand_jumps_to_emitted_label(tmp_path):
+    src = """
+glob { } proc { } func { }
+main {
+  var { x }
+  x = 1;
+  if ( ( not ( x > 1 ) ) or ( x > 2 ) ) { print x } else { halt }
+}
+"""
+    cg = CodeGenerator(Parser(src).parse())
+    cg.generate(str(tmp_path / "out.int.txt"))
+    out = cg.output
+    first = next(k for k, line in enumerate(out) if line.startswith("IF x > 1 THEN "))
+    fall = out[first].split(" THEN ")[1]
+    assert fall.startswith("OR") and out[first + 1] == "REM " + fall
+    assert out[first + 2].startswith("IF x > 2 THEN T")
+    labels = {line[4:] for line in out if line.startswith("REM ")}
+    assert all(line.split(" THEN ")[1] in labels for line in out if line.startswith("IF "))
@@ -47,6 +47,7 @@ def test_numbers_valid_and_tokenization():
     ts = toks("0 7 42 999")
     assert [t.typ for t in ts[:4]] == [T.NUMBER, T.NUMBER, T.NUMBER, T.NUMBER]
     assert [t.lexeme for t in ts[:4]] == ["0", "7", "42", "999"]
+    assert [t.value for t in ts[:4]] == [0, 7, 42, 999]  # converted once, in the lexer
 
     # "01" should be tokenized as NUMBER("0") then IDENT("1") won't match;
     # actually "1" starts a NUMBER, so you'll get NUMBER("0"), NUMBER("1")
@@ -120,3 +121,21 @@ main { var { t }
     tt = types(prog)
     assert T.GLOB in tt and T.MAIN in tt and T.PRINT in tt and T.HALT in tt
     assert tt[-1] == T.EOF
+
+
+def test_repeated_names_share_one_string():
+    ts = toks("abc x abc 42 42")
+    assert ts[0].lexeme is ts[2].lexeme
+    assert ts[3].lexeme is ts[4].lexeme
+
+
+def test_tokenize_all_matches_next_token():
+    src = 'glob { x y }\nproc { }\nfunc { }\nmain { var { a } a = "hi"; print a; halt }'
+    assert Lexer(src).tokenize_all() == toks(src)
+
+
+def test_tokenize_all_keeps_error():
+    lx = Lexer('main { x = 1 $ }')
+    out = lx.tokenize_all()
+    assert [t.lexeme for t in out] == ["main", "{", "x", "=", "1"]
+    assert "Unknown character" in str(lx.error)
@@ -44,3 +44,26 @@ glob { } proc { p(a) { local { } halt } } func { } main { var { } p(x) }
     c = tree.main.algo.instrs[0]
     assert isinstance(c, Call)
     assert c.name == "p"
+
+
+def test_assign_deeply_nested_term_does_not_recurse():
+    term = "a"
+    for _ in range(5000):  # well past the default recursion limit
+        term = f"( {term} plus 1 )"
+    tree = parse(f"glob {{ }} proc {{ }} func {{ }} main {{ var {{ }} x = {term} }}")
+    rhs = tree.main.algo.instrs[0].rhs
+    depth = 0
+    while isinstance(rhs, TermBin):
+        rhs = rhs.left
+        depth += 1
+    assert depth == 5000 and rhs.atom.name == "a"
+
+
+def test_parsed_nodes_have_no_instance_dict():
+    prog = """
+glob { g } proc { p(a) { local { } print a } } func { }
+main { var { x } x = ( ( neg 2 ) plus g ); p(x); print "hi"; halt }
+"""
+    arena = AstArena.build(parse(prog))
+    assert len(arena) > 10
+    assert not [type(n).__name__ for n in arena.nodes if hasattr(n, "__dict__")]
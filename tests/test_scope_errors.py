@@ -76,3 +76,20 @@ def test_dup_locals():
     # the diagnostic message text may vary; check for key words
     assert contains(d, "Duplicate") and contains(d, "Local") or contains(d, "Duplicate declaration of 'a'"), \
         f"Expected duplicate-local diagnostic, got: {d}"
+
+
+def test_diagnostic_order_globals_then_names_then_main_then_locals():
+    text = ("glob { x x p } proc { p ( a a ) { local { } halt } } func { } "
+            "main { var { y y } halt }")
+    ast = Parser(text).parse()
+    assign_ids(ast)
+    checker = ScopeChecker(ast)
+    checker.check()
+    got = [(d.kind, d.message.split("'")[1]) for d in checker.diagnostics]
+    assert got == [
+        ("DuplicateName", "x"),
+        ("DuplicateName", "y"),
+        ("CrossCategoryClash", "p"),
+        ("DuplicateName", "a"),  # Duplicate parameter 'a' ...
+        ("DuplicateName", "a"),  # ... and the Local scope's duplicate declaration
+    ]
@@ -13,3 +13,32 @@ def test_richer_ok():
     checker = ScopeChecker(ast)
     checker.check()
     assert checker.diagnostics == []
+
+def test_assign_ids_runs_extra_visitors_in_same_walk():
+    from spl.ast_ids import count_nodes, get_all_node_ids
+    text = open(os.path.join(os.path.dirname(__file__), "..", "examples", "richer.spl"), encoding="utf-8").read()
+    ast = Parser(text).parse()
+    seen = []
+    assign_ids(ast, lambda n: seen.append(n.node_id))
+    assert seen == get_all_node_ids(ast) == list(range(1, count_nodes(ast) + 1))
+
+def test_declare_many_reports_duplicates_without_raising():
+    from spl.symbol_table import SymbolTable, SymbolTableEntry, create_base_scopes
+    st = SymbolTable()
+    create_base_scopes(st)
+    gid = st.base_scopes['global']
+    entries = [SymbolTableEntry(n, 'var', gid, 100 + i) for i, n in enumerate(["a", "b", "a"])]
+    rejected = st.declare_many(gid, entries)
+    assert [(e.decl_node_id, "Duplicate declaration of 'a'" in msg) for e, msg in rejected] == [(102, True)]
+    assert st.lookup_local(gid, "a") is entries[0] and st.nodes[101] is entries[1]
+
+def test_check_scopes_reuses_table_for_same_declarations():
+    from spl.astnodes import Assign, TermAtom
+    from spl.scope_checker import check_scopes
+    text = 'glob { g } proc { } func { } main { var { x } x = g ; halt }'
+    first, second = Parser(text).parse(), Parser(text.replace("x = g", "g = x")).parse()
+    assign_ids(first); assign_ids(second)
+    st = check_scopes(first)
+    assert check_scopes(second) is st
+    rhs = second.main.algo.instrs[0].rhs
+    assert isinstance(rhs, TermAtom) and rhs.atom.resolved is st.lookup_local(st.base_scopes['main'], 'x')